@@ -0,0 +1,594 @@
+"""Shared helpers for the offline benchmarks.
+
+Benchmarks import ``app`` without reaching MongoDB, RapidAPI, Groq or
+Telegram; MongoDB is replaced by mongomock, which is not an app dependency.
+Install requirements-dev.txt, then run them from the repository root, e.g.::
+
+    pip install -r requirements-dev.txt
+    python benchmarks/bench_market_data.py
+"""
+import importlib
+import json
+import os
+import ssl
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Bot API limit on message text, mirrored so fakes reject what Telegram would
+TELEGRAM_MESSAGE_LIMIT = 4096
+
+
+def serialize_mongomock(mongomock):
+    """Make each mongomock write atomic, as it is on a real server.
+
+    The repository runs queries on a thread pool and mongomock is not thread-safe:
+    two concurrent ``update_many`` calls can both match a document the other is
+    updating, which a server never allows.
+    """
+    from mongomock.collection import Collection
+
+    if getattr(Collection, "_serialized", False):
+        return
+    lock = threading.RLock()
+
+    def locked(method):
+        def wrapper(*args, **kwargs):
+            with lock:
+                return method(*args, **kwargs)
+        return wrapper
+
+    for name in ("insert_one", "insert_many", "update_one", "update_many", "replace_one", "delete_one",
+                 "delete_many", "find_one", "find_one_and_update", "find_one_and_delete", "count_documents",
+                 "aggregate", "distinct", "bulk_write"):
+        setattr(Collection, name, locked(getattr(Collection, name)))
+
+    # find() cursors read the store lazily; snapshot the matches so a concurrent
+    # write cannot change the dict under an iterating cursor
+    iter_documents = Collection._iter_documents
+
+    def snapshot(self, *args, **kwargs):
+        with lock:
+            return iter(list(iter_documents(self, *args, **kwargs)))
+
+    Collection._iter_documents = snapshot
+    Collection._serialized = True
+
+
+def index_mongomock(mongomock, fields=("_id", "user_id", "date")):
+    """Serve equality filters on ``fields`` from a hash index instead of a full scan.
+
+    mongomock evaluates every query against every document, so with thousands of
+    users the fake database, not the bot, would dominate a load test. Documents
+    are indexed on write; queries with a plain top-level equality on one of
+    ``fields`` only evaluate the filter against the matching documents. Indexed
+    fields are assumed not to be changed by updates, which holds for this app.
+    """
+    from mongomock.collection import Collection
+    from mongomock.filtering import filter_applies
+    from mongomock.store import CollectionStore
+
+    if getattr(CollectionStore, "_indexed", False):
+        return
+
+    def field_index(store):
+        index = store.__dict__.get("_field_index")
+        if index is None:
+            index = store._field_index = {field: {} for field in fields}
+            for key, document in store._documents.items():
+                add(index, key, document)
+        return index
+
+    def add(index, key, document):
+        for field, values in index.items():
+            value = document.get(field)
+            if value is not None and not isinstance(value, (dict, list)):
+                values.setdefault(value, set()).add(key)
+
+    def discard(index, key, document):
+        for field, values in index.items():
+            value = document.get(field)
+            if value is not None and not isinstance(value, (dict, list)):
+                keys = values.get(value)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del values[value]
+
+    setitem, delitem, drop = CollectionStore.__setitem__, CollectionStore.__delitem__, CollectionStore.drop
+
+    def indexed_setitem(store, key, document):
+        index = field_index(store)
+        previous = store._documents.get(key)
+        if previous is not None:
+            discard(index, key, previous)
+        setitem(store, key, document)
+        add(index, key, document)
+
+    def indexed_delitem(store, key):
+        previous = store._documents.get(key)
+        delitem(store, key)
+        if previous is not None:
+            discard(field_index(store), key, previous)
+
+    def indexed_drop(store):
+        drop(store)
+        store.__dict__.pop("_field_index", None)
+
+    iter_documents = Collection._iter_documents
+
+    def indexed_iter_documents(self, filter):
+        if isinstance(filter, dict):
+            for field in fields:
+                value = filter.get(field)
+                if value is None or isinstance(value, (dict, list)):
+                    continue
+                documents = self._store._documents
+                keys = field_index(self._store)[field].get(value, ())
+                candidates = [documents[key] for key in keys if key in documents]
+                return (document for document in candidates if filter_applies(filter, document))
+        return iter_documents(self, filter)
+
+    CollectionStore.__setitem__ = indexed_setitem
+    CollectionStore.__delitem__ = indexed_delitem
+    CollectionStore.drop = indexed_drop
+    Collection._iter_documents = indexed_iter_documents
+    CollectionStore._indexed = True
+
+
+def load_app(index: bool = False):
+    """Import app.py with an in-memory MongoDB (mongomock) in place of the real server.
+
+    ``index=True`` adds the ``index_mongomock`` hash index, for benches with enough
+    users that mongomock's full scans would swamp what they measure. Benches that
+    time the queries themselves must leave it off.
+    """
+    import mongomock
+    import pymongo
+
+    os.environ.setdefault("TELEGRAM_TOKEN", "0:benchmark")
+    os.environ.setdefault("GROQ_API", "benchmark")
+    os.environ.setdefault("RAPID_KEY", "benchmark")
+    # Recorded prices go to a scratch directory, not the repository's history/
+    os.environ.setdefault("HISTORY_DIR", tempfile.mkdtemp(prefix="stockerbot-history-"))
+    pymongo.MongoClient = lambda *args, **kwargs: mongomock.MongoClient()
+    if index:
+        index_mongomock(mongomock)
+    serialize_mongomock(mongomock)
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+    return importlib.import_module("app")
+
+
+def stock_payload(name: str, price: float = 2500.0) -> dict:
+    """A /stock response shaped like the RapidAPI payload."""
+    return {
+        "companyName": f"{name} Ltd",
+        "industry": "Diversified",
+        "currentPrice": {"NSE": f"{price:.2f}", "BSE": f"{price:.2f}"},
+        "stockTechnicalData": [
+            {"days": days, "bsePrice": f"{price * (1 - days / 1000):.2f}", "nsePrice": f"{price * (1 - days / 1000):.2f}"}
+            for days in (5, 10, 20, 50, 100, 300)
+        ],
+        "riskMeter": {"categoryName": "Moderate", "stdDev": 1.2},
+        "recentNews": [
+            {"headline": f"{name} headline {i}", "date": "2025-01-01"} for i in range(5)
+        ],
+    }
+
+
+class StubStockServer:
+    """Local HTTP/1.1 keep-alive stand-in for the RapidAPI /stock endpoint.
+
+    With ``tls=True`` a throwaway self-signed certificate is generated with the
+    ``openssl`` CLI so that handshake cost is part of the measurement.
+    """
+
+    def __init__(self, latency: float = 0.0, tls: bool = False):
+        self.latency = latency
+        self.tls = tls
+        self.requests = 0
+        outer = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                outer.requests += 1
+                if outer.latency:
+                    time.sleep(outer.latency)
+                query = parse_qs(urlparse(self.path).query)
+                name = query.get("name", ["UNKNOWN"])[0]
+                body = json.dumps(stock_payload(name)).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        if tls:
+            self._certdir = tempfile.TemporaryDirectory()
+            certfile = os.path.join(self._certdir.name, "cert.pem")
+            keyfile = os.path.join(self._certdir.name, "key.pem")
+            subprocess.run(
+                ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+                 "-subj", "/CN=127.0.0.1", "-keyout", keyfile, "-out", certfile],
+                check=True, capture_output=True,
+            )
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.load_cert_chain(certfile, keyfile)
+            self._server.socket = context.wrap_socket(self._server.socket, server_side=True)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    @property
+    def base_url(self) -> str:
+        scheme = "https" if self.tls else "http"
+        return f"{scheme}://127.0.0.1:{self.port}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class FakeMessage:
+    """Records replies and edits the way a Telegram ``Message`` would receive them.
+
+    Text longer than Telegram's limit is rejected, as the Bot API does.
+    """
+
+    def __init__(self, text: str = "", on_send=None, reply_markup=None):
+        self.text = text
+        self.on_send = on_send
+        self.reply_markup = reply_markup
+        self.replies = []
+        self.edits = []
+
+    @staticmethod
+    def check_length(text: str):
+        if len(text) > TELEGRAM_MESSAGE_LIMIT:
+            raise ValueError(f"Message is too long: {len(text)} > {TELEGRAM_MESSAGE_LIMIT} characters")
+
+    async def reply_text(self, text, reply_markup=None, **kwargs):
+        self.check_length(text)
+        reply = FakeMessage(text, on_send=self.on_send, reply_markup=reply_markup)
+        self.replies.append(reply)
+        if self.on_send:
+            self.on_send(reply)
+        return reply
+
+    async def edit_text(self, text, **kwargs):
+        self.check_length(text)
+        self.text = text
+        self.edits.append(text)
+        if self.on_send:
+            self.on_send(self)
+        return self
+
+
+class FakeUser:
+    def __init__(self, user_id: int, username: str = None):
+        self.id = user_id
+        self.username = username or f"user{user_id}"
+
+
+class FakeCallbackQuery:
+    """An inline keyboard press; edits land on ``message`` like a real edit would."""
+
+    def __init__(self, data: str, on_send=None):
+        self.data = data
+        self.message = FakeMessage(on_send=on_send)
+
+    async def answer(self, *args, **kwargs):
+        return True
+
+    async def edit_message_text(self, text, **kwargs):
+        return await self.message.edit_text(text, **kwargs)
+
+
+class FakeUpdate:
+    def __init__(self, user_id: int, text: str = "", on_send=None, callback_data: str = None):
+        self.effective_user = FakeUser(user_id)
+        self.message = FakeMessage(text, on_send=on_send)
+        self.callback_query = FakeCallbackQuery(callback_data, on_send) if callback_data is not None else None
+
+
+def fake_context():
+    from types import SimpleNamespace
+
+    return SimpleNamespace(user_data={}, bot=None)
+
+
+def latency_stock_source(app, latency: float, error_rate: float = 0.0, seed: int = 7):
+    """Replace the RapidAPI client with an in-process source of fixed latency.
+
+    ``error_rate`` of the calls fail with ``ConnectionError`` after the latency.
+    Returns a counter dict whose ``requests`` key counts upstream calls.
+    """
+    import asyncio
+    import random
+
+    rng = random.Random(seed)
+    counter = {"requests": 0, "errors": 0}
+
+    async def get_stock(stock_name):
+        counter["requests"] += 1
+        await asyncio.sleep(latency)
+        if error_rate and rng.random() < error_rate:
+            counter["errors"] += 1
+            raise ConnectionError(f"stock API unavailable for {stock_name}")
+        return stock_payload(stock_name)
+
+    app.market_data.get_stock = get_stock
+    return counter
+
+
+class FakeBot:
+    """Stand-in for ``telegram.Bot`` that records sends after a fixed latency.
+
+    ``error_rate`` of the sends fail with ``telegram.error.NetworkError``;
+    ``sent_at`` holds the ``perf_counter`` time of each recorded send.
+    """
+
+    def __init__(self, latency: float = 0.0, error_rate: float = 0.0, seed: int = 7):
+        import random
+
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.sent = []
+        self.sent_at = []
+        self.errors = 0
+
+    async def send_message(self, chat_id, text, **kwargs):
+        import asyncio
+
+        from telegram.error import NetworkError
+
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.error_rate and self.rng.random() < self.error_rate:
+            self.errors += 1
+            raise NetworkError("fake send failure")
+        FakeMessage.check_length(text)
+        self.sent.append((chat_id, text))
+        self.sent_at.append(time.perf_counter())
+        return FakeMessage(text)
+
+
+class FakeApplication:
+    def __init__(self, bot):
+        self.bot = bot
+
+
+def fake_completion_content(messages) -> str:
+    """JSON answer for a chat completion request; batch prompts get one entry per symbol."""
+    recommendation = {"recommendation": "Buy", "confidence": 0.7}
+    if "keyed by" in messages[0]["content"]:
+        batch = json.loads(messages[-1]["content"])
+        return json.dumps({symbol: recommendation for symbol in batch})
+    return json.dumps(recommendation)
+
+
+def fake_groq_class(latency: float = 0.0, counter: dict = None, error_rate: float = 0.0, seed: int = 7):
+    """Build a drop-in for ``groq.Groq`` whose completions sleep then return JSON.
+
+    ``error_rate`` of the completions raise ``RuntimeError`` instead.
+    """
+    import random
+    from types import SimpleNamespace
+
+    rng = random.Random(seed)
+    lock = threading.Lock()
+    counter = counter if counter is not None else {}
+    counter.setdefault("requests", 0)
+    counter.setdefault("prompt_chars", 0)
+    counter.setdefault("errors", 0)
+
+    def create(messages, **kwargs):
+        with lock:
+            counter["requests"] += 1
+            counter["prompt_chars"] += sum(len(m["content"]) for m in messages)
+            failed = error_rate and rng.random() < error_rate
+            counter["errors"] += bool(failed)
+        if latency:
+            time.sleep(latency)
+        if failed:
+            raise RuntimeError("fake completion failure")
+        content = fake_completion_content(messages)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    class FakeGroq:
+        def __init__(self, *args, **kwargs):
+            self.chat = SimpleNamespace(completions=SimpleNamespace(create=create))
+
+    FakeGroq.counter = counter
+    return FakeGroq
+
+
+def slow_mongo(app, latency: float, error_rate: float = 0.0, seed: int = 7):
+    """Add a network round trip (and optional ``AutoReconnect`` failures) to every repository call.
+
+    The sleep happens on the repository's executor thread, so a slow database
+    holds a pool worker the way a blocking driver call would.
+    Returns a counter dict with ``calls`` and ``errors``.
+    """
+    import functools
+    import random
+
+    from pymongo.errors import AutoReconnect
+
+    repo = app.portfolio_repo
+    run = getattr(repo, "_fast_run", None) or repo._run
+    repo._fast_run = run
+    rng = random.Random(seed)
+    lock = threading.Lock()
+    counter = {"calls": 0, "errors": 0}
+
+    def delayed(func, *args, **kwargs):
+        with lock:
+            counter["calls"] += 1
+            failed = error_rate and rng.random() < error_rate
+            counter["errors"] += bool(failed)
+        if latency:
+            time.sleep(latency)
+        if failed:
+            raise AutoReconnect("fake connection reset")
+        return func(*args, **kwargs)
+
+    async def _run(operation, func, *args, **kwargs):
+        return await run(operation, functools.partial(delayed, func), *args, **kwargs)
+
+    repo._run = _run
+    return counter
+
+
+def percentiles(timings: list, elapsed: float = None) -> dict:
+    """p50/p95/p99/max of ``timings`` (seconds) in ms, plus throughput when ``elapsed`` is given."""
+    ordered = sorted(timings)
+    if not ordered:
+        return {"count": 0}
+
+    def at(q):
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * q))] * 1e3, 3)
+
+    stats = {"count": len(ordered), "p50_ms": at(0.50), "p95_ms": at(0.95), "p99_ms": at(0.99),
+             "max_ms": round(ordered[-1] * 1e3, 3)}
+    if elapsed:
+        stats["throughput_per_s"] = round(len(ordered) / elapsed, 1)
+    return stats
+
+
+def seed_users(app, users: int, holdings: int, symbols: int, seed: int = 7):
+    """Opt ``users`` users into notifications, each with ``holdings`` random lots.
+
+    Position summaries are rebuilt from the seeded lots, as ``backfill_positions`` would.
+    """
+    import random
+
+    rng = random.Random(seed)
+    app.portfolio_repo.user_settings.delete_many({})
+    app.portfolio_repo.portfolio.delete_many({})
+    app.portfolio_repo.positions.delete_many({})
+    app.portfolio_repo.daily_runs.delete_many({})
+    app.portfolio_repo.daily_jobs.delete_many({})
+    app.portfolio_repo.predictions.delete_many({})
+    app.portfolio_repo.user_settings.insert_many([
+        {"user_id": user_id, "notifications": 1} for user_id in range(1, users + 1)
+    ])
+    app.portfolio_repo.portfolio.insert_many([
+        {
+            "stock_code": f"SYM{rng.randrange(symbols)}",
+            "buy_price": round(rng.uniform(100, 3000), 2),
+            "quantity": rng.randint(1, 100),
+            "user_id": user_id,
+        }
+        for user_id in range(1, users + 1)
+        for _ in range(holdings)
+    ])
+    for user_id in range(1, users + 1):
+        app.portfolio_repo._rebuild_positions(user_id)
+
+
+class FakeLLMServer:
+    """Local OpenAI-compatible chat completions endpoint usable as ``GROQ_BASE_URL``.
+
+    Counts requests and (estimated) prompt/completion tokens. ``drop_rate`` omits
+    that fraction of symbols from batch answers to exercise the fallback path.
+    """
+
+    def __init__(self, latency: float = 0.0, drop_rate: float = 0.0, seed: int = 7):
+        import random
+
+        self.latency = latency
+        self.drop_rate = drop_rate
+        self.rng = random.Random(seed)
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self._lock = threading.Lock()
+        outer = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out in separate writes; without this a kept-alive
+            # connection waits ~40 ms for a delayed ACK on every response
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                if outer.latency:
+                    time.sleep(outer.latency)
+                content = fake_completion_content(request["messages"])
+                if outer.drop_rate and "keyed by" in request["messages"][0]["content"]:
+                    answer = json.loads(content)
+                    with outer._lock:
+                        answer = {k: v for k, v in answer.items() if outer.rng.random() >= outer.drop_rate}
+                    content = json.dumps(answer)
+                prompt_tokens = sum(len(m["content"]) for m in request["messages"]) // 4
+                completion_tokens = len(content) // 4
+                with outer._lock:
+                    outer.requests += 1
+                    outer.prompt_tokens += prompt_tokens
+                    outer.completion_tokens += completion_tokens
+                body = json.dumps({
+                    "id": f"chatcmpl-{outer.requests}",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": request.get("model", "fake"),
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                        "logprobs": None,
+                    }],
+                    "usage": {
+                        "prompt_tokens": prompt_tokens,
+                        "completion_tokens": completion_tokens,
+                        "total_tokens": prompt_tokens + completion_tokens,
+                    },
+                }).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def reset(self):
+        self.requests = self.prompt_tokens = self.completion_tokens = 0
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,152 @@
+"""Price alert evaluation: sorted per-symbol thresholds vs. scanning every alert.
+
+Loads many random alerts into ``AlertEngine``, replays a random-walk tick
+stream through ``QuoteTable.update`` and compares the time per tick with a
+naive loop over all active alerts. Checks that both fire exactly the same
+alerts, then flushes them through a fake bot to show one message per user.
+Finally replays the flush against a bot that drops a share of the sends and
+a Mongo update that fails once: every alert is delivered exactly once and
+marked triggered only after its message went out.
+
+    python benchmarks/bench_alerts.py [--alerts 100000] [--symbols 500] [--ticks 20000]
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from _harness import FakeBot, load_app
+
+app = load_app()
+
+
+def make_alerts(count: int, symbols: int, users: int, rng: random.Random) -> list:
+    return [
+        {
+            "_id": i,
+            "user_id": rng.randrange(users),
+            "stock_code": f"SYM{rng.randrange(symbols)}",
+            "direction": rng.choice(("above", "below")),
+            "threshold": round(rng.uniform(50, 150), 2),
+        }
+        for i in range(count)
+    ]
+
+
+def make_ticks(count: int, symbols: int, rng: random.Random) -> list:
+    prices = {f"SYM{i}": 100.0 for i in range(symbols)}
+    ticks = []
+    for _ in range(count):
+        symbol = f"SYM{rng.randrange(symbols)}"
+        prices[symbol] = max(1.0, prices[symbol] * (1 + rng.gauss(0, 0.01)))
+        ticks.append((symbol, prices[symbol]))
+    return ticks
+
+
+def naive(alerts: list, ticks: list) -> tuple:
+    active = list(alerts)
+    fired = []
+    start = time.perf_counter()
+    for symbol, price in ticks:
+        still_active = []
+        for alert in active:
+            if alert["stock_code"] == symbol and (
+                price <= alert["threshold"] if alert["direction"] == "below" else price >= alert["threshold"]
+            ):
+                fired.append(alert["_id"])
+            else:
+                still_active.append(alert)
+        active = still_active
+    return time.perf_counter() - start, fired
+
+
+def indexed(alerts: list, ticks: list) -> tuple:
+    app.alert_engine = engine = app.AlertEngine()
+    app.quote_table._listeners = [engine.on_price]
+    engine.load(alerts)
+    start = time.perf_counter()
+    for symbol, price in ticks:
+        app.quote_table.update(symbol, price)
+    elapsed = time.perf_counter() - start
+    return elapsed, [alert["_id"] for alert, _ in engine._fired], engine
+
+
+async def flush(engine) -> tuple:
+    bot = FakeBot()
+    limiter = app.SendRateLimiter(global_rate=1e9, chat_interval=0)
+    users = len({alert["user_id"] for alert, _ in engine._fired})
+    fired = await engine.flush(bot, limiter)
+    return fired, users, len(bot.sent)
+
+
+async def flaky_flush(engine, error_rate: float) -> tuple:
+    fired = [alert for alert, _ in engine._fired]
+    bot = FakeBot(error_rate=error_rate)
+    limiter = app.SendRateLimiter(global_rate=1e9, chat_interval=0)
+    marked = []
+    calls = []
+
+    async def mark(alerts):
+        calls.append(len(alerts))
+        if len(calls) == 1:
+            raise ConnectionError("mongo unavailable")
+        sent_to = {chat_id for chat_id, _ in bot.sent}
+        assert all(alert["user_id"] in sent_to for alert in alerts), "marked before its message went out"
+        marked.extend(alert["_id"] for alert in alerts)
+
+    app.portfolio_repo.mark_alerts_triggered = mark
+    app.ALERT_SEND_ATTEMPTS = 100
+    rounds = 0
+    while engine._fired or engine._unmarked:
+        rounds += 1
+        try:
+            await engine.flush(bot, limiter)
+        except ConnectionError:
+            pass
+    delivered = sum(text.count("\n") for _, text in bot.sent)
+    assert sorted(marked) == sorted(alert["_id"] for alert in fired), "every alert marked exactly once"
+    assert delivered == len(fired), (delivered, len(fired))
+    return len(fired), bot.errors, rounds
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--alerts", type=int, default=100_000)
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--users", type=int, default=5_000)
+    parser.add_argument("--ticks", type=int, default=20_000)
+    parser.add_argument("--error-rate", type=float, default=0.2, help="share of sends failing in the flaky flush")
+    parser.add_argument("--naive-ticks", type=int, default=500, help="ticks replayed through the naive scan")
+    args = parser.parse_args()
+
+    rng = random.Random(13)
+    alerts = make_alerts(args.alerts, args.symbols, args.users, rng)
+    ticks = make_ticks(args.ticks, args.symbols, rng)
+
+    naive_ticks = ticks[:args.naive_ticks]
+    naive_time, naive_fired = naive(alerts, naive_ticks)
+    check_time, check_fired, _ = indexed(alerts, naive_ticks)
+    assert sorted(naive_fired) == sorted(check_fired), "indexed engine fired a different set of alerts"
+
+    indexed_time, fired, engine = indexed(alerts, ticks)
+    print(f"{args.alerts} alerts over {args.symbols} symbols")
+    print(f"naive scan:   {naive_time / len(naive_ticks) * 1e6:10.1f} us/tick ({len(naive_ticks)} ticks, "
+          f"{len(naive_fired)} fired)")
+    print(f"sorted index: {indexed_time / len(ticks) * 1e6:10.1f} us/tick ({len(ticks)} ticks, "
+          f"{len(fired)} fired, {len(engine)} still active)")
+
+    async def noop(alerts):
+        return None
+
+    app.portfolio_repo.mark_alerts_triggered = noop
+    sent, users, messages = asyncio.run(flush(engine))
+    print(f"flush: {sent} alerts to {users} users in {messages} messages")
+
+    _, _, engine = indexed(alerts, ticks)
+    fired, errors, rounds = asyncio.run(flaky_flush(engine, args.error_rate))
+    print(f"flaky flush: {fired} alerts delivered and marked once each despite {errors} failed sends "
+          f"and a failed Mongo update, in {rounds} rounds - OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Per-batch timing and peak memory of the daily job's user streaming.
+
+Seeds synthetic opted-in users and holdings, then runs send_daily_predictions
+with zero-latency fakes for RapidAPI, Groq and Telegram at several
+DAILY_USER_BATCH_SIZE values, reporting per-batch timing and the tracemalloc
+peak. The old per-user (N+1) holdings loading is timed for comparison.
+
+    python benchmarks/bench_daily_batches.py --users 5000 --batch-sizes 100 500 2000
+    python benchmarks/bench_daily_batches.py --mongo-uri mongodb://localhost:27017 --users 100000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import tracemalloc
+
+from _harness import FakeApplication, FakeBot, fake_groq_class, latency_stock_source, load_app, seed_users
+
+# Thousands of seeded users: look them up by index, as the server would with ensure_indexes
+app = load_app(index=True)
+
+
+def use_database(mongo_uri: str):
+    if not mongo_uri:
+        return
+    import pymongo.mongo_client
+
+    db = pymongo.mongo_client.MongoClient(mongo_uri)["stockerbot_bench"]
+    app.portfolio_repo = app.PortfolioRepository(lambda: db)
+
+
+async def n_plus_one_load() -> float:
+    start = time.perf_counter()
+    for user in app.portfolio_repo.user_settings.find({"notifications": 1}):
+        list(app.portfolio_repo.portfolio.find({"user_id": user["user_id"]}))
+    return time.perf_counter() - start
+
+
+async def main(args):
+    use_database(args.mongo_uri)
+    seed_users(app, args.users, args.holdings, args.symbols)
+    await app.portfolio_repo.ensure_indexes()
+    latency_stock_source(app, 0.0)
+    app.clients.reset_groq(fake_groq_class())
+    # Sends are not what is measured here
+    app.TELEGRAM_GLOBAL_RATE = 1e9
+    app.TELEGRAM_CHAT_INTERVAL = 0.0
+
+    print(f"N+1 holdings load for {args.users} users: {await n_plus_one_load():.3f}s")
+    print(f"{'batch size':>10} | {'batches':>7} | {'mean batch s':>12} | {'max batch s':>11} | {'total s':>7} | {'peak MiB':>8}")
+    for batch_size in args.batch_sizes:
+        app.DAILY_USER_BATCH_SIZE = batch_size
+        app.prediction_cache.invalidate()
+        # Each batch size is a fresh daily run, not a resume of the previous one
+        app.portfolio_repo.daily_runs.delete_many({})
+        app.portfolio_repo.daily_jobs.delete_many({})
+        app.portfolio_repo.predictions.delete_many({})
+        tracemalloc.start()
+        start = time.perf_counter()
+        summary = await app.send_daily_predictions(FakeApplication(FakeBot()))
+        total = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        batches = summary["batches"]
+        print(f"{batch_size:>10} | {len(batches):>7} | {statistics.mean(batches):>12.3f} | "
+              f"{max(batches):>11.3f} | {total:>7.2f} | {peak / 2 ** 20:>8.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mongo-uri", default=None)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--holdings", type=int, default=5)
+    parser.add_argument("--symbols", type=int, default=200)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[100, 500, 2000])
+    asyncio.run(main(parser.parse_args()))
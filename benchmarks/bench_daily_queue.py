@@ -0,0 +1,175 @@
+"""Failure handling and parallel draining of the durable daily run queue.
+
+Runs ``send_daily_predictions`` against local fakes in three scenarios and
+checks the queue's guarantees:
+
+* flaky sends: users whose first send fails are retried and served, a user
+  whose sends always fail ends up dead-lettered after DAILY_JOB_MAX_ATTEMPTS;
+* poison batch: a batch that raises every time it is served keeps losing
+  its lease; its jobs are dead-lettered after DAILY_JOB_MAX_ATTEMPTS and the
+  run still finishes;
+* crash: the run is cancelled mid-way, then a restart (``enqueue=False``)
+  re-leases the lost batches once their lease expires; every user is reached,
+  only users of the in-flight batches can receive a second digest, and no
+  symbol is predicted again;
+* two instances drain the same run concurrently; every user gets exactly
+  one digest, every symbol is predicted by one of them only, and the queue
+  status reports throughput.
+
+    python benchmarks/bench_daily_queue.py [--users 1000] [--batch-size 100]
+"""
+import argparse
+import asyncio
+import time
+from collections import Counter
+
+from _harness import FakeApplication, FakeBot, fake_groq_class, latency_stock_source, load_app, seed_users
+
+# Thousands of seeded users: look them up by index, as the server would with ensure_indexes
+app = load_app(index=True)
+# Symbols sent to the LLM, across every run of the current scenario
+predicted = Counter()
+
+
+class FlakyBot(FakeBot):
+    """Fails the first send to ``flaky`` chats and every send to ``broken`` chats."""
+
+    def __init__(self, flaky=(), broken=(), latency: float = 0.0):
+        super().__init__(latency)
+        self.flaky = set(flaky)
+        self.broken = set(broken)
+
+    async def send_message(self, chat_id, text, **kwargs):
+        if chat_id in self.broken:
+            raise ConnectionError("chat unreachable")
+        if chat_id in self.flaky:
+            self.flaky.discard(chat_id)
+            raise ConnectionError("transient failure")
+        return await super().send_message(chat_id, text, **kwargs)
+
+
+def reset(args):
+    seed_users(app, args.users, args.holdings, args.symbols)
+    app.prediction_cache.invalidate()
+    predicted.clear()
+
+
+def count_predictions(predict):
+    def counted(batch):
+        predicted.update(list(batch))
+        return predict(batch)
+    return counted
+
+
+def digests(bot) -> Counter:
+    return Counter(chat_id for chat_id, text in bot.sent if text.startswith("📊"))
+
+
+async def flaky_sends(args):
+    reset(args)
+    bot = FlakyBot(flaky=range(1, 11), broken=[args.users])
+    summary = await app.send_daily_predictions(FakeApplication(bot))
+    status = await app.portfolio_repo.daily_queue_status(summary["day"])
+    received = digests(bot)
+    assert status["dead"] == 1 and status["done"] == args.users - 1, status
+    assert all(received[user_id] == 1 for user_id in range(1, args.users)), "every other user served once"
+    dead = app.portfolio_repo.daily_jobs.find_one({"status": "dead"})
+    print(f"flaky sends: {status['done']} done, 10 retried, 1 dead-lettered after {dead['attempts']} "
+          f"attempts ({dead['last_error']}) - OK")
+
+
+async def poison_batch(args):
+    reset(args)
+    poison = args.users // 2
+    complete = app.portfolio_repo.complete_daily_jobs
+
+    async def failing_complete(token, user_ids):
+        # Raised out of serve_batch, so fail_daily_job never runs for this batch
+        if poison in user_ids:
+            raise RuntimeError("poison batch")
+        return await complete(token, user_ids)
+
+    app.portfolio_repo.complete_daily_jobs = failing_complete
+    try:
+        start = time.perf_counter()
+        summary = await asyncio.wait_for(app.send_daily_predictions(FakeApplication(FakeBot())), 30)
+    finally:
+        app.portfolio_repo.complete_daily_jobs = complete
+    status = await app.portfolio_repo.daily_queue_status(summary["day"])
+    dead = app.portfolio_repo.daily_jobs.find_one({"user_id": poison, "date": summary["day"]})
+    assert dead["status"] == "dead" and dead["attempts"] == app.DAILY_JOB_MAX_ATTEMPTS, dead
+    assert status["done"] + status["dead"] == args.users and status["leased"] == 0, status
+    print(f"poison batch: {status['dead']} jobs dead-lettered after {dead['attempts']} expired leases "
+          f"({dead['last_error']}), {status['done']} done in {time.perf_counter() - start:.2f}s - OK")
+
+
+async def crash_and_resume(args):
+    reset(args)
+    bot = FakeBot(latency=0.001)
+    run = asyncio.ensure_future(app.send_daily_predictions(FakeApplication(bot)))
+    while len(digests(bot)) < args.users // 3:
+        await asyncio.sleep(0.01)
+    run.cancel()
+    await asyncio.gather(run, return_exceptions=True)
+    before = len(digests(bot))
+    status = await app.portfolio_repo.daily_queue_status(app.trading_day())
+    print(f"crash: cancelled after {before} digests, queue {status['done']} done / "
+          f"{status['leased']} leased / {status['pending']} pending")
+
+    start = time.perf_counter()
+    await app.send_daily_predictions(FakeApplication(bot), enqueue=False)
+    received = digests(bot)
+    duplicates = sum(1 for count in received.values() if count > 1)
+    assert set(received) == set(range(1, args.users + 1)), "every user reached after the restart"
+    assert duplicates <= app.DAILY_QUEUE_WORKERS * app.DAILY_USER_BATCH_SIZE, duplicates
+    assert set(predicted.values()) == {1}, "the resumed run reuses the stored predictions"
+    print(f"resume: finished in {time.perf_counter() - start:.2f}s after lease expiry, "
+          f"all {len(received)} users reached, {duplicates} re-sent from in-flight batches, "
+          f"{len(predicted)} symbols predicted once - OK")
+
+
+async def two_instances(args):
+    reset(args)
+    # Long enough that heartbeats keep every lease; only the crash scenario wants quick expiry
+    app.DAILY_JOB_LEASE = 10
+    bot = FakeBot(latency=0.001)
+    start = time.perf_counter()
+    first, second = await asyncio.gather(
+        app.send_daily_predictions(FakeApplication(bot)),
+        app.send_daily_predictions(FakeApplication(bot)),
+    )
+    elapsed = time.perf_counter() - start
+    received = digests(bot)
+    assert len(received) == args.users and set(received.values()) == {1}, "exactly one digest per user"
+    assert set(predicted.values()) == {1}, "each symbol predicted by one instance"
+    status = await app.portfolio_repo.daily_queue_status(first["day"])
+    print(f"two instances: {first['users']} + {second['users']} users in {elapsed:.2f}s, "
+          f"{len(predicted)} symbols predicted once, {status['per_min']} users/min by queue status - OK")
+
+
+async def main(args):
+    await app.portfolio_repo.ensure_indexes()
+    latency_stock_source(app, 0.0)
+    app.clients.reset_groq(fake_groq_class())
+    app.get_predictions_for_stocks = count_predictions(app.get_predictions_for_stocks)
+    app.TELEGRAM_GLOBAL_RATE = 1e9
+    app.TELEGRAM_CHAT_INTERVAL = 0.0
+    app.TELEGRAM_SEND_RETRIES = 0
+    app.DAILY_USER_BATCH_SIZE = args.batch_size
+    app.DAILY_JOB_RETRY_DELAY = 0.05
+    app.DAILY_JOB_LEASE = 0.5
+    app.DAILY_QUEUE_POLL = 0.05
+    app.PREDICTION_CLAIM_TTL = 0.5
+    await flaky_sends(args)
+    await poison_batch(args)
+    await crash_and_resume(args)
+    await two_instances(args)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--holdings", type=int, default=3)
+    parser.add_argument("--symbols", type=int, default=100)
+    parser.add_argument("--batch-size", type=int, default=100)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,173 @@
+"""Write and read cost of the local price history store.
+
+Uses a scratch directory and synthetic sessions (a random walk, one quote
+every five minutes while NSE is open):
+
+* record: per-quote cost of a write on the history thread (session row update
+  plus intraday snapshot; the event loop only queues it), checked against
+  features recomputed from scratch;
+* backfill: ``extend`` with a year of daily closes in one call vs one
+  ``record`` per close;
+* read: ``features`` (stored features, last rows only) vs recomputing them
+  from the whole file, and ``/history`` rendering;
+* disk: bytes actually allocated per symbol;
+* processes: several processes appending to the same symbol at once; rows
+  must stay complete and in time order.
+
+    python benchmarks/bench_history.py [--symbols 200] [--sessions 30]
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+from _harness import load_app
+
+app = load_app()
+
+FIRST_SESSION = datetime(2026, 6, 1, 9, 20, tzinfo=app.MARKET_TIMEZONE)  # a Monday
+QUOTES_PER_SESSION = 74  # 09:20 to 15:25 every five minutes
+
+
+def sessions(count: int):
+    day = FIRST_SESSION
+    while count:
+        if day.weekday() < 5:
+            yield day
+            count -= 1
+        day += timedelta(days=1)
+
+
+def new_store(directory: str = None):
+    return app.PriceHistory(directory or tempfile.mkdtemp(prefix="bench-history-"), 300)
+
+
+def bench_record(args) -> app.PriceHistory:
+    history = new_store()
+    rng = np.random.default_rng(3)
+    prices = {f"SYM{i}": 100.0 + i for i in range(args.symbols)}
+    timings = []
+    for day in sessions(args.sessions):
+        for step in range(QUOTES_PER_SESSION):
+            ts = (day + timedelta(minutes=5 * step)).timestamp()
+            for symbol in prices:
+                prices[symbol] *= 1 + rng.normal(0, 0.002)
+                start = time.perf_counter()
+                history.record(symbol, prices[symbol], ts)
+                timings.append(time.perf_counter() - start)
+    timings.sort()
+    rows = history.rows("SYM0")
+    closes = rows["price"]
+    expected = app.rolling_features(closes)
+    for name in app.HISTORY_FEATURES:
+        assert np.allclose(rows[name], expected[name], equal_nan=True, rtol=1e-5), name
+    print(f"record: {len(timings)} quotes, p50 {timings[len(timings) // 2] * 1e6:.0f} us, "
+          f"p99 {timings[int(len(timings) * 0.99)] * 1e6:.0f} us; "
+          f"{len(rows)} sessions and {len(history.rows('SYM0', 'intraday'))} snapshots per symbol")
+    return history
+
+
+def bench_backfill(args):
+    rng = np.random.default_rng(5)
+    days = [day.replace(hour=15, minute=29).timestamp() for day in sessions(250)]
+    closes = 100 * np.cumprod(1 + rng.normal(0, 0.01, len(days)))
+    history = new_store()
+    start = time.perf_counter()
+    for i in range(args.symbols):
+        history.extend(f"SYM{i}", "daily", days, closes)
+    bulk = (time.perf_counter() - start) / args.symbols
+    one_by_one = new_store()
+    start = time.perf_counter()
+    for i in range(min(args.symbols, 20)):
+        for ts, close in zip(days, closes):
+            one_by_one.record(f"SYM{i}", close, ts)
+    looped = (time.perf_counter() - start) / min(args.symbols, 20)
+    bulk_rows, looped_rows = history.rows("SYM0"), one_by_one.rows("SYM0")
+    assert np.array_equal(bulk_rows[["ts", "price"]], looped_rows[["ts", "price"]])
+    for name in app.HISTORY_FEATURES:
+        assert np.allclose(bulk_rows[name], looped_rows[name], equal_nan=True, rtol=1e-5), name
+    print(f"backfill of 250 sessions: extend {bulk * 1e3:.2f} ms per symbol, "
+          f"record per close {looped * 1e3:.1f} ms per symbol ({looped / bulk:.0f}x)")
+    return history
+
+
+def bench_read(history, args):
+    symbols = [f"SYM{i}" for i in range(args.symbols)]
+    start = time.perf_counter()
+    history.features_many(symbols)
+    stored = (time.perf_counter() - start) / len(symbols)
+    start = time.perf_counter()
+    for symbol in symbols:
+        app.rolling_features(history.rows(symbol)["price"])
+    recomputed = (time.perf_counter() - start) / len(symbols)
+    start = time.perf_counter()
+    for symbol in symbols[:50]:
+        app.render_history(symbol)
+    rendered = (time.perf_counter() - start) / 50
+    print(f"features: {stored * 1e6:.0f} us per symbol from stored columns, "
+          f"{recomputed * 1e6:.0f} us recomputing over the whole file; /history render {rendered * 1e3:.2f} ms")
+
+
+def disk_usage(history) -> tuple:
+    allocated = 0
+    files = 0
+    for root, _, names in os.walk(history.directory):
+        for name in names:
+            if name.endswith(".npy"):
+                allocated += os.stat(os.path.join(root, name)).st_blocks * 512
+                files += 1
+    return allocated, files
+
+
+def append_worker(directory: str, worker: int, rows: int, counts):
+    history = new_store(directory)
+    written = 0
+    for _ in range(rows):
+        ts = time.time()
+        # The price encodes the timestamp, so torn or mixed-up rows are detectable
+        written += history.extend("SHARED", "intraday", [ts], [ts % 1e5])
+    counts[worker] = written
+
+
+def bench_processes(args):
+    directory = tempfile.mkdtemp(prefix="bench-history-")
+    context = multiprocessing.get_context("fork")
+    counts = context.Array("i", args.processes)
+    workers = [context.Process(target=append_worker, args=(directory, i, 500, counts)) for i in range(args.processes)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+    rows = new_store(directory).rows("SHARED", "intraday")
+    assert len(rows) == sum(counts), (len(rows), list(counts))
+    assert np.all(np.diff(rows["ts"]) > 0), "rows in time order"
+    assert np.allclose(rows["price"], rows["ts"] % 1e5), "no torn rows"
+    print(f"{args.processes} processes x 500 appends to one symbol: {len(rows)} rows kept "
+          f"({args.processes * 500 - len(rows)} out-of-order skipped) in {elapsed:.2f}s - OK")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", type=int, default=200)
+    parser.add_argument("--sessions", type=int, default=30, help="sessions of quotes fed to record()")
+    parser.add_argument("--processes", type=int, default=4)
+    args = parser.parse_args()
+
+    recorded = bench_record(args)
+    allocated, files = disk_usage(recorded)
+    print(f"disk: {allocated / files / 1024:.0f} KiB allocated per file ({files} files, "
+          f"{app.HISTORY_DAILY_ROWS} daily / {app.HISTORY_INTRADAY_ROWS} intraday rows of "
+          f"{np.dtype(app.HISTORY_COLUMNS).itemsize} bytes at capacity)")
+    backfilled = bench_backfill(args)
+    app.price_history = backfilled
+    bench_read(backfilled, args)
+    bench_processes(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Requests and tokens per symbol for batched LLM predictions.
+
+Runs ``plan_prediction_batches`` + ``get_predictions_for_stocks`` for a set of
+synthetic symbols against a local fake OpenAI-compatible endpoint at several
+batch sizes. ``--drop-rate`` makes the fake omit symbols from batch answers so
+the per-symbol fallback cost shows up in the numbers.
+
+    python benchmarks/bench_llm_batching.py [--symbols 100] [--batch-sizes 1 5 10 25]
+"""
+import argparse
+import asyncio
+import time
+
+from _harness import FakeLLMServer, load_app, stock_payload
+
+app = load_app()
+
+
+async def run(batches, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(batch):
+        async with semaphore:
+            return await asyncio.to_thread(app.get_predictions_for_stocks, batch)
+
+    results = await asyncio.gather(*[one(batch) for batch in batches])
+    return {code: prediction for result in results for code, prediction in result.items()}
+
+
+async def main(args):
+    market = {
+        f"SYM{i}": app.build_market_data(f"SYM{i}", stock_payload(f"SYM{i}")) for i in range(args.symbols)
+    }
+    with FakeLLMServer(latency=args.latency, drop_rate=args.drop_rate) as server:
+        app.GROQ_BASE_URL = server.base_url
+        app.clients.reset_groq()
+        print(f"{'batch':>5} | {'batches':>7} | {'requests/sym':>12} | {'prompt tok/sym':>14} | {'compl tok/sym':>13} | {'wall s':>6}")
+        for size in args.batch_sizes:
+            server.reset()
+            batches = app.plan_prediction_batches(market, max_size=size, token_budget=args.token_budget)
+            start = time.perf_counter()
+            predictions = await run(batches, args.concurrency)
+            wall = time.perf_counter() - start
+            assert len(predictions) == len(market)
+            n = len(market)
+            print(f"{size:>5} | {len(batches):>7} | {server.requests / n:>12.2f} | "
+                  f"{server.prompt_tokens / n:>14.1f} | {server.completion_tokens / n:>13.1f} | {wall:>6.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--symbols", type=int, default=100)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 5, 10, 25])
+    parser.add_argument("--token-budget", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.05, help="fake LLM latency per request (s)")
+    parser.add_argument("--drop-rate", type=float, default=0.0)
+    parser.add_argument("--concurrency", type=int, default=4)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,226 @@
+"""Load simulation for the bot handlers against local fakes, reported as JSON.
+
+Seeds ``--users`` synthetic users, then drives the handlers the way Telegram
+would, ``--concurrency`` users at a time:
+
+* ``view``: ``/view`` for every user (quote cache cold at the start);
+* ``add``: a full ``/add`` conversation (command, typed name, price, quantity);
+* ``remove``: a full ``/remove`` conversation selling one share of the first lot;
+* ``daily``: one ``send_daily_predictions`` run over every user, where latency
+  is the time from the start of the run to each user's digest.
+
+RapidAPI, Groq, Telegram and MongoDB are replaced with in-process fakes whose
+latency and error rate are set per service. Telegram rate limits are lifted so
+the run measures the bot rather than the limiter. Each scenario reports
+p50/p95/p99/max latency, throughput, errors and peak memory (process RSS, plus
+the Python heap with ``--trace-memory``). With ``--baseline`` the report is
+compared against an earlier one and the exit status is 1 when a scenario's p95,
+p99 or throughput got worse by more than ``--tolerance``.
+
+    python benchmarks/bench_load.py [--users 2000] [--scenarios view add remove daily] \\
+        [--api-latency 0.05] [--mongo-latency 0.001] [--output report.json] [--baseline old.json]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from _harness import (
+    FakeApplication,
+    FakeBot,
+    FakeUpdate,
+    fake_context,
+    fake_groq_class,
+    latency_stock_source,
+    load_app,
+    percentiles,
+    seed_users,
+    slow_mongo,
+)
+
+# Thousands of seeded users: look them up by index, as the server would with ensure_indexes
+app = load_app(index=True)
+
+SCENARIOS = ("view", "add", "remove", "daily")
+# Lower is better for latencies, higher for throughput
+COMPARED = {"p95_ms": 1, "p99_ms": 1, "throughput_per_s": -1}
+
+
+async def drive(users: range, concurrency: int, operation) -> tuple:
+    """Run ``operation(user_id)`` for every user, ``concurrency`` at a time; returns (timings, errors, elapsed)."""
+    semaphore = asyncio.Semaphore(concurrency)
+    timings = []
+    errors = []
+
+    async def one(user_id):
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await operation(user_id)
+            except Exception as exc:
+                errors.append(type(exc).__name__)
+                return
+            timings.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[one(user_id) for user_id in users])
+    return timings, errors, time.perf_counter() - start
+
+
+async def view(user_id: int):
+    await app.view_portfolio_command(FakeUpdate(user_id), fake_context())
+
+
+async def add(user_id: int):
+    context = fake_context()
+    steps = ((app.add_stock, "/add"), (app.stock_code_input_handler, "reliance"),
+             (app.stock_buy_price_handler, "2400"), (app.stock_quantity_handler, "10"))
+    for handler, text in steps:
+        state = await handler(FakeUpdate(user_id, text), context)
+    if state != app.ConversationHandler.END:
+        raise RuntimeError(f"/add ended in state {state}")
+
+
+async def remove(user_id: int):
+    context = fake_context()
+    update = FakeUpdate(user_id, "/remove")
+    if await app.remove_stock_start(update, context) != app.REMOVAL_SELECTION:
+        raise RuntimeError("/remove found no holdings")
+    button = update.message.replies[-1].reply_markup.inline_keyboard[0][0]
+    selection = FakeUpdate(user_id, callback_data=button.callback_data)
+    if await app.remove_stock_handler(selection, context) != app.REMOVAL_SELL_PRICE:
+        raise RuntimeError(f"/remove selection failed: {selection.callback_query.message.text}")
+    await app.remove_stock_sell_price_handler(FakeUpdate(user_id, "2600"), context)
+    update = FakeUpdate(user_id, "1")
+    state = await app.remove_stock_quantity_handler(update, context)
+    if state != app.ConversationHandler.END:
+        raise RuntimeError(f"/remove ended in state {state}: {update.message.replies[-1].text}")
+
+
+async def daily(args) -> tuple:
+    bot = FakeBot(args.send_latency, args.send_error_rate)
+    start = time.perf_counter()
+    try:
+        summary = await app.send_daily_predictions(FakeApplication(bot))
+    except Exception as exc:
+        # Injected faults can stop the run itself; report how far it got
+        summary = {"aborted": type(exc).__name__}
+    elapsed = time.perf_counter() - start
+    delivered = {}
+    for (chat_id, text), sent_at in zip(bot.sent, bot.sent_at):
+        if text.startswith("📊"):
+            delivered.setdefault(chat_id, sent_at - start)
+    errors = ["undelivered"] * (args.users - len(delivered))
+    return list(delivered.values()), errors, elapsed, summary
+
+
+def reset_caches():
+    app.quote_cache.invalidate()
+    app.quote_table.clear()
+    app.prediction_cache.invalidate()
+
+
+async def run_scenario(name: str, args) -> dict:
+    reset_caches()
+    users = range(1, args.users + 1)
+    if args.trace_memory:
+        tracemalloc.start()
+    extra = {}
+    if name == "daily":
+        timings, errors, elapsed, summary = await daily(args)
+        extra = {key: summary[key] for key in ("symbols", "batches", "failed", "aborted") if key in summary}
+    else:
+        operation = {"view": view, "add": add, "remove": remove}[name]
+        timings, errors, elapsed = await drive(users, args.concurrency, operation)
+    report = percentiles(timings, elapsed)
+    report.update(errors=len(errors), error_types=sorted(set(errors)), elapsed_s=round(elapsed, 3), **extra)
+    if args.trace_memory:
+        report["heap_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 1)
+        tracemalloc.stop()
+    report["peak_rss_mb"] = app.peak_memory_mb()
+    return report
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> list:
+    regressions = []
+    for name, current in report["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous:
+            continue
+        for metric, sign in COMPARED.items():
+            old, new = previous.get(metric), current.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if change * sign > tolerance:
+                regressions.append(f"{name}.{metric}: {old} -> {new} ({change:+.0%})")
+    return regressions
+
+
+async def main(args) -> dict:
+    logging.disable(logging.CRITICAL)
+    await app.portfolio_repo.ensure_indexes()
+    latency_stock_source(app, args.api_latency, args.api_error_rate)
+    app.clients.reset_groq(fake_groq_class(args.llm_latency, error_rate=args.llm_error_rate))
+    slow_mongo(app, args.mongo_latency, args.mongo_error_rate)
+    app.TELEGRAM_GLOBAL_RATE = 1e9
+    app.TELEGRAM_CHAT_INTERVAL = 0.0
+    app.DAILY_JOB_RETRY_DELAY = 0.05
+    app.DAILY_QUEUE_POLL = 0.05
+    seed_users(app, args.users, args.holdings, args.symbols)
+
+    scenarios = {}
+    for name in args.scenarios:
+        if name == "daily":
+            # Earlier scenarios added and sold lots; give the digest run the seeded portfolios
+            seed_users(app, args.users, args.holdings, args.symbols)
+        scenarios[name] = await run_scenario(name, args)
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "baseline")},
+        "scenarios": scenarios,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--holdings", type=int, default=5, help="seeded lots per user")
+    parser.add_argument("--symbols", type=int, default=200, help="distinct seeded symbols")
+    parser.add_argument("--concurrency", type=int, default=100, help="users served at the same time")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--api-latency", type=float, default=0.05, help="RapidAPI latency (s)")
+    parser.add_argument("--api-error-rate", type=float, default=0.0)
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="Groq completion latency (s)")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--send-latency", type=float, default=0.01, help="Telegram send latency (s)")
+    parser.add_argument("--send-error-rate", type=float, default=0.0)
+    parser.add_argument("--mongo-latency", type=float, default=0.001, help="MongoDB round trip (s)")
+    parser.add_argument("--mongo-error-rate", type=float, default=0.0)
+    parser.add_argument("--trace-memory", action="store_true", help="also report the Python heap peak (slower)")
+    parser.add_argument("--output", help="write the JSON report here as well as to stdout")
+    parser.add_argument("--baseline", help="earlier JSON report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative regression")
+    args = parser.parse_args()
+
+    report = asyncio.run(main(args))
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("config") != report["config"]:
+            print("warning: the baseline was run with a different configuration", file=sys.stderr)
+        regressions = compare(report, baseline, args.tolerance)
+        for line in regressions:
+            print(f"regression: {line}", file=sys.stderr)
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,71 @@
+"""Compare the legacy per-call http.client path with the pooled async client.
+
+The legacy path opens a fresh connection per lookup and runs it on the default
+thread pool via ``asyncio.to_thread``; the new path is ``app.MarketDataClient``.
+Both hit a local stub server, bypassing the quote cache so every lookup is a
+real request.
+
+    python benchmarks/bench_market_data.py [--latency 0.02] [--rounds 3] [--tls]
+"""
+import argparse
+import asyncio
+import http.client
+import json
+import ssl
+import time
+import urllib.parse
+
+from _harness import StubStockServer, load_app
+
+app = load_app()
+
+
+def legacy_fetch(port: int, stock_name: str, tls: bool) -> dict:
+    if tls:
+        conn = http.client.HTTPSConnection("127.0.0.1", port, context=ssl._create_unverified_context())
+    else:
+        conn = http.client.HTTPConnection("127.0.0.1", port)
+    endpoint = f"/stock?name={urllib.parse.quote(stock_name)}"
+    conn.request("GET", endpoint, headers={"x-rapidapi-host": app.RAPID_API_HOST})
+    data = conn.getresponse().read()
+    conn.close()
+    return json.loads(data.decode("utf-8"))
+
+
+async def run_legacy(port: int, concurrency: int, tls: bool) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        asyncio.to_thread(legacy_fetch, port, f"SYM{i}", tls) for i in range(concurrency)
+    ])
+    return time.perf_counter() - start
+
+
+async def run_pooled(client, concurrency: int) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(*[client.get_stock(f"SYM{i}") for i in range(concurrency)])
+    return time.perf_counter() - start
+
+
+async def main(args):
+    with StubStockServer(latency=args.latency, tls=args.tls) as server:
+        client = app.MarketDataClient(
+            base_url=server.base_url, api_key="benchmark", max_connections=args.max_connections, verify=not args.tls
+        )
+        # Warm the pool once so the steady state is measured, as in a long-running bot
+        await client.get_stock("WARMUP")
+        print(f"{'concurrency':>11} | {'legacy ms':>10} | {'pooled ms':>10} | {'speedup':>7}")
+        for concurrency in args.concurrency:
+            legacy = min([await run_legacy(server.port, concurrency, args.tls) for _ in range(args.rounds)])
+            pooled = min([await run_pooled(client, concurrency) for _ in range(args.rounds)])
+            print(f"{concurrency:>11} | {legacy * 1000:>10.1f} | {pooled * 1000:>10.1f} | {legacy / pooled:>6.2f}x")
+        await client.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=0.02, help="stub server latency per request (s)")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--max-connections", type=int, default=20)
+    parser.add_argument("--tls", action="store_true", help="serve HTTPS so handshakes are included")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 100])
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,74 @@
+"""Cost of the hot-path instrumentation and of a Prometheus scrape.
+
+Times ``metrics.span`` (the wrapper around every handler, external call and
+Mongo operation) against an empty block, then fills the registry with a
+realistic number of series and times ``render`` and a scrape over HTTP.
+
+    python benchmarks/bench_metrics.py [--spans 200000] [--series 300]
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+from _harness import load_app
+
+app = load_app()
+
+PORT = 18990
+
+
+def per_call(func, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return (time.perf_counter() - start) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--spans", type=int, default=200_000)
+    parser.add_argument("--series", type=int, default=300, help="label combinations per metric")
+    args = parser.parse_args()
+
+    registry = app.Metrics()
+
+    def bare():
+        pass
+
+    def spanned():
+        with registry.span("external", service="rapidapi", operation="stock"):
+            pass
+
+    baseline = per_call(bare, args.spans)
+    span = per_call(spanned, args.spans) - baseline
+    print(f"span overhead: {span * 1e6:.2f} us per call")
+
+    for i in range(args.series):
+        with registry.span("mongo", operation=f"op{i % 40}"):
+            pass
+        with registry.span("handler", handler=f"handler{i % 30}"):
+            pass
+        registry.inc("external_retries_total", service=f"service{i % 3}")
+    rendered = registry.render()
+    render = per_call(registry.render, 200)
+    print(f"render: {render * 1e3:.2f} ms for {len(rendered.splitlines())} lines ({len(rendered) / 1024:.0f} KiB)")
+
+    async def scrape():
+        app.metrics = registry
+        await app.start_metrics_server(PORT)
+        try:
+            async with httpx.AsyncClient() as client:
+                start = time.perf_counter()
+                for _ in range(50):
+                    response = await client.get(f"http://127.0.0.1:{PORT}/metrics")
+                    assert response.status_code == 200 and response.text == registry.render()
+                return (time.perf_counter() - start) / 50
+        finally:
+            await app.stop_metrics_server()
+
+    print(f"scrape over HTTP: {asyncio.run(scrape()) * 1e3:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Latency of the /view and /remove portfolio lookups at several collection sizes.
+
+/view reads the user's position summaries (``find_positions``); /remove lists
+the user's lots and loads the one picked. Uses ``app.PortfolioRepository``
+against a plain in-memory mongomock database by default, which scans every
+query, or a real server with ``--mongo-uri`` (recommended for 1M rows). Only a
+real server honours the indexes created by ``ensure_indexes``, so only then is
+each size measured both without and with them.
+
+    python benchmarks/bench_mongo_lookups.py --sizes 1000 100000
+    python benchmarks/bench_mongo_lookups.py --mongo-uri mongodb://localhost:27017 --sizes 1000 100000 1000000
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from _harness import load_app
+
+app = load_app()
+
+
+def make_db(mongo_uri: str):
+    if mongo_uri:
+        import pymongo.mongo_client
+
+        return pymongo.mongo_client.MongoClient(mongo_uri)["stockerbot_bench"]
+    import mongomock
+
+    return mongomock.MongoClient()["stockerbot_bench"]
+
+
+def seed(db, rows: int, holdings_per_user: int, batch: int = 10000):
+    db["portfolio"].drop()
+    db["positions"].drop()
+    db["user_settings"].drop()
+    rng = random.Random(7)
+    for offset in range(0, rows, batch):
+        db["portfolio"].insert_many([
+            {
+                "stock_code": f"SYM{rng.randrange(500)}",
+                "buy_price": round(rng.uniform(100, 3000), 2),
+                "quantity": rng.randint(1, 100),
+                "user_id": i // holdings_per_user,
+                "username": f"user{i // holdings_per_user}",
+                "buy_timestamp": None,
+            }
+            for i in range(offset, min(rows, offset + batch))
+        ])
+
+
+async def measure(func, samples: int) -> tuple:
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        await func()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.95) - 1]
+
+
+async def main(args):
+    if args.sizes is None:
+        args.sizes = [1000, 100000, 1000000] if args.mongo_uri else [1000, 100000]
+    db = make_db(args.mongo_uri)
+    repo = app.PortfolioRepository(lambda: db)
+    print(f"{'rows':>8} | {'indexed':>7} | {'/view p50 ms':>12} | {'/view p95 ms':>12} | {'/remove p50 ms':>14} | {'/remove p95 ms':>14}")
+    for rows in args.sizes:
+        seed(db, rows, args.holdings_per_user)
+        await repo.backfill_positions()
+        users = max(1, rows // args.holdings_per_user)
+        doc_ids = [str(doc["_id"]) for doc in db["portfolio"].find({}, {"_id": 1}).limit(1000)]
+        rng = random.Random(11)
+        for indexed in ((False, True) if args.mongo_uri else (False,)):
+            if indexed:
+                await repo.ensure_indexes()
+
+            async def view():
+                await repo.find_positions(rng.randrange(users))
+
+            async def remove():
+                await repo.find_holdings(rng.randrange(users), app.HOLDING_REMOVE_FIELDS)
+                await repo.get_holding(rng.choice(doc_ids), app.HOLDING_REMOVE_FIELDS)
+
+            view_p50, view_p95 = await measure(view, args.samples)
+            remove_p50, remove_p95 = await measure(remove, args.samples)
+            print(f"{rows:>8} | {str(indexed):>7} | {view_p50:>12.2f} | {view_p95:>12.2f} | {remove_p50:>14.2f} | {remove_p95:>14.2f}")
+    repo.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mongo-uri", default=None)
+    parser.add_argument("--sizes", type=int, nargs="+", default=None,
+                        help="rows to seed (default 1k/100k/1M with --mongo-uri, 1k/100k in memory)")
+    parser.add_argument("--holdings-per-user", type=int, default=10)
+    parser.add_argument("--samples", type=int, default=50)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,123 @@
+"""Concurrent partial sells on the same lot, plus sell throughput.
+
+Fires many concurrent ``PortfolioRepository.sell_holding`` calls at a single
+lot and checks the invariants: shares sold never exceed the lot, every
+successful sale has exactly one trade record, and the lot is deleted once it
+reaches zero. Then interrupts sales right after the decrement and checks that
+``recover_sales`` records each trade once and restores the positions, and
+measures sells/second across many lots. Use ``--mongo-uri``
+for a real server; the in-memory mongomock default does not model server-side
+concurrency or write latency.
+
+    python benchmarks/bench_partial_sells.py [--mongo-uri mongodb://localhost:27017]
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+from _harness import load_app
+
+app = load_app()
+
+
+def make_db(mongo_uri: str):
+    if mongo_uri:
+        import pymongo.mongo_client
+
+        return pymongo.mongo_client.MongoClient(mongo_uri)["stockerbot_bench"]
+    import mongomock
+
+    return mongomock.MongoClient()["stockerbot_bench"]
+
+
+async def check_concurrent_sells(repo, lot_quantity: int, sellers: int, sell_quantity: int):
+    repo.portfolio.drop()
+    repo.trades.drop()
+    doc_id = str(repo.portfolio.insert_one(
+        {"stock_code": "RELIANCE", "buy_price": 2400.0, "quantity": lot_quantity, "user_id": 1}
+    ).inserted_id)
+    results = await asyncio.gather(*[repo.sell_holding(doc_id, 2500.0, sell_quantity) for _ in range(sellers)])
+    succeeded = [lot for lot in results if lot is not None]
+    sold = sum(trade["quantity"] for trade in repo.trades.find({"lot_id": app.ObjectId(doc_id)}))
+    remaining = repo.portfolio.find_one({"_id": app.ObjectId(doc_id)})
+    expected_sales = min(sellers, lot_quantity // sell_quantity)
+    assert len(succeeded) == expected_sales, (len(succeeded), expected_sales)
+    assert sold == expected_sales * sell_quantity, sold
+    assert repo.trades.count_documents({}) == expected_sales
+    if sold == lot_quantity:
+        assert remaining is None, remaining
+    else:
+        assert remaining["quantity"] == lot_quantity - sold and remaining["fills"] == [], remaining
+    print(f"{sellers} concurrent sells of {sell_quantity} on a lot of {lot_quantity}: "
+          f"{len(succeeded)} filled, {sold} shares sold, lot {'deleted' if remaining is None else 'kept'} - OK")
+
+
+async def check_recovery(repo, interrupted: int):
+    repo.portfolio.drop()
+    repo.trades.drop()
+    repo.positions.drop()
+    lots = [{"stock_code": "TCS", "buy_price": 3500.0, "quantity": 10, "user_id": 1},
+            {"stock_code": "INFY", "buy_price": 1500.0, "quantity": 2, "user_id": 1}]
+    ids = [str(doc_id) for doc_id in repo.portfolio.insert_many(lots).inserted_ids]
+    repo._rebuild_positions(1)
+    record_trade = repo._record_trade
+
+    def crash(lot, fill):
+        raise RuntimeError("process died after the decrement")
+
+    repo._record_trade = crash
+    logging.disable(logging.ERROR)
+    for doc_id in [ids[0]] * (interrupted - 1) + [ids[1]]:
+        # The sale still succeeds: the shares are taken and the rest is left to recover_sales()
+        assert await repo.sell_holding(doc_id, 3600.0, 2 if doc_id == ids[1] else 1) is not None
+    logging.disable(logging.NOTSET)
+    repo._record_trade = record_trade
+    assert repo.trades.count_documents({}) == 0
+    recovered = await repo.recover_sales(min_age=0)
+    again = await repo.recover_sales(min_age=0)
+    positions = {position["stock_code"]: position["quantity"] for position in repo.positions.find({"user_id": 1})}
+    assert recovered == interrupted and again == 0, (recovered, again)
+    assert repo.trades.count_documents({}) == interrupted
+    assert positions == {"TCS": 10 - (interrupted - 1)}, positions
+    assert repo.portfolio.find_one({"_id": app.ObjectId(ids[1])}) is None, "sold-out lot removed"
+    assert repo.portfolio.find_one({"_id": app.ObjectId(ids[0])})["fills"] == []
+    print(f"{interrupted} sales interrupted after the decrement: {recovered} trades recovered once, "
+          f"positions rebuilt, sold-out lot removed - OK")
+
+
+async def throughput(repo, lots: int, sells_per_lot: int) -> float:
+    repo.portfolio.drop()
+    repo.trades.drop()
+    ids = repo.portfolio.insert_many([
+        {"stock_code": f"SYM{i}", "buy_price": 100.0, "quantity": sells_per_lot, "user_id": i} for i in range(lots)
+    ]).inserted_ids
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        repo.sell_holding(str(doc_id), 110.0, 1) for doc_id in ids for _ in range(sells_per_lot)
+    ])
+    elapsed = time.perf_counter() - start
+    assert repo.portfolio.count_documents({}) == 0
+    return lots * sells_per_lot / elapsed
+
+
+async def main(args):
+    db = make_db(args.mongo_uri)
+    repo = app.PortfolioRepository(lambda: db, max_workers=args.workers)
+    await repo.ensure_indexes()
+    await check_concurrent_sells(repo, lot_quantity=100, sellers=50, sell_quantity=3)
+    await check_concurrent_sells(repo, lot_quantity=100, sellers=10, sell_quantity=10)
+    await check_concurrent_sells(repo, lot_quantity=10, sellers=20, sell_quantity=1)
+    await check_recovery(repo, interrupted=5)
+    rate = await throughput(repo, args.lots, args.sells_per_lot)
+    print(f"Throughput: {rate:.0f} sells/s ({args.lots} lots x {args.sells_per_lot} sells, {args.workers} DB workers)")
+    repo.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mongo-uri", default=None)
+    parser.add_argument("--lots", type=int, default=200)
+    parser.add_argument("--sells-per-lot", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=8)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,144 @@
+"""Import time and time to first response of a fresh bot process.
+
+Every measurement runs in a new interpreter, so one-off costs (imports,
+client construction, index builds) are not hidden by an earlier run:
+
+* import: wall time of ``import app`` (minus bare interpreter startup), the
+  slowest imports made by app.py from ``-X importtime``, and what the deferred
+  imports (groq, numpy) would add if loaded eagerly;
+* first vs second response of ``/add`` (symbol index), ``/view`` (numpy) and
+  a prediction (real groq client against a local fake endpoint), with and
+  without ``warm_up()`` having run first. Holdings are added through the
+  ``/add`` conversation so that seeding does not load anything early.
+
+    python benchmarks/bench_startup.py [--runs 5]
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from _harness import REPO_ROOT
+
+DEFERRED = "groq, numpy"
+
+
+def child_env() -> dict:
+    env = dict(os.environ)
+    env.setdefault("TELEGRAM_TOKEN", "0:benchmark")
+    env.setdefault("GROQ_API", "benchmark")
+    env.setdefault("RAPID_KEY", "benchmark")
+    env["PYTHONWARNINGS"] = "ignore"
+    return env
+
+
+def timed_python(code: str, runs: int) -> float:
+    """Median wall time (s) of ``python -c code`` in the repository root."""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, env=child_env(), check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def slowest_imports(count: int) -> list:
+    """Modules imported directly by app.py, by cumulative import time (us)."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app"], cwd=REPO_ROOT,
+                            env=child_env(), check=True, capture_output=True, text=True)
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Nesting is shown by two spaces per level after the separator; app's own imports sit
+        # at depth 1 and are reported before app itself
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 0:
+            if name.strip() == "app":
+                break
+            # A module imported by the interpreter itself, not by app.py
+            modules = []
+        elif depth == 1:
+            modules.append((int(cumulative), name.strip()))
+    return sorted(modules, reverse=True)[:count]
+
+
+async def first_responses(warm: bool) -> dict:
+    # Runs in the child process: the app is imported fresh, nothing is built yet
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from _harness import FakeLLMServer, FakeUpdate, fake_context, latency_stock_source, load_app, stock_payload
+
+    app = load_app()
+    latency_stock_source(app, 0.0)
+    report = {}
+    with FakeLLMServer() as server:
+        app.GROQ_BASE_URL = server.base_url
+        if warm:
+            start = time.perf_counter()
+            await app.warm_up()
+            report["warm_up_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        for label, name in (("first", "reliance"), ("second", "tcs")):
+            context = fake_context()
+            start = time.perf_counter()
+            for handler, text in ((app.add_stock, "/add"), (app.stock_code_input_handler, name),
+                                  (app.stock_buy_price_handler, "2400"), (app.stock_quantity_handler, "10")):
+                await handler(FakeUpdate(1, text), context)
+            report[f"{label}_add_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        for label in ("first", "second"):
+            start = time.perf_counter()
+            await app.view_portfolio_command(FakeUpdate(1), fake_context())
+            report[f"{label}_view_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        for label, code in (("first", "SYM0"), ("second", "SYM1")):
+            market = app.build_market_data(code, stock_payload(code))
+            start = time.perf_counter()
+            await app.get_cached_predictions_batch({code: market})
+            report[f"{label}_prediction_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    return report
+
+
+def measure_first_responses(warm: bool, runs: int) -> dict:
+    reports = []
+    for _ in range(runs):
+        command = [sys.executable, os.path.abspath(__file__), "--child"] + (["--warm"] if warm else [])
+        result = subprocess.run(command, cwd=REPO_ROOT, env=child_env(), check=True,
+                                capture_output=True, text=True)
+        reports.append(json.loads(result.stdout.splitlines()[-1]))
+    return {key: statistics.median(report[key] for report in reports) for key in reports[0]}
+
+
+def main(args):
+    interpreter = timed_python("pass", args.runs)
+    imported = timed_python("import app", args.runs)
+    eager = timed_python(f"import app, {DEFERRED}", args.runs)
+    print(f"import app: {(imported - interpreter) * 1000:.0f} ms "
+          f"(interpreter startup {interpreter * 1000:.0f} ms excluded)")
+    print(f"deferred imports ({DEFERRED}): {(eager - imported) * 1000:.0f} ms saved at startup")
+    print("slowest imports:")
+    for cumulative, name in slowest_imports(args.top):
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    columns = ("add", "view", "prediction")
+    print(f"{'':>4} | {'warm-up ms':>10} | " + " | ".join(f"{name + ' 1st/2nd ms':>20}" for name in columns))
+    for warm in (False, True):
+        report = measure_first_responses(warm, args.runs)
+        cells = [f"{report[f'first_{name}_ms']:>9.1f} / {report[f'second_{name}_ms']:<8.1f}" for name in columns]
+        print(f"{'warm' if warm else 'cold':>4} | {report.get('warm_up_ms', 0):>10.1f} | " + " | ".join(cells))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="fresh processes per measurement (median reported)")
+    parser.add_argument("--top", type=int, default=8, help="slowest imports to list")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--warm", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        print(json.dumps(asyncio.run(first_responses(args.warm))))
+    else:
+        main(args)
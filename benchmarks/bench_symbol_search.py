@@ -0,0 +1,90 @@
+"""Symbol resolution latency for the /add and /news autocomplete.
+
+Times ``SymbolIndex.resolve`` and ``SymbolIndex.search`` over a mix of exact,
+prefix, partial-name and misspelt queries, first against the bundled symbol
+master and then against a synthetic master padded to ``--entries`` rows to show
+how lookups scale with a full exchange listing. Also checks that the sample
+queries rank the expected symbol first.
+
+    python benchmarks/bench_symbol_search.py [--entries 10000] [--rounds 200]
+"""
+import argparse
+import random
+import statistics
+import string
+import time
+
+from _harness import load_app
+
+app = load_app()
+
+EXPECTED = {
+    "reliance": "RELIANCE",
+    "reliance ind": "RELIANCE",
+    "relaince": "RELIANCE",
+    "relience": "RELIANCE",
+    "500325": "RELIANCE",
+    "532977": "BAJAJ-AUTO",
+    "hdfc bank": "HDFCBANK",
+    "infosys": "INFY",
+    "tata moters": "TATAMOTORS",
+    "bajaj auto": "BAJAJ-AUTO",
+    "state bank": "SBIN",
+    "larsen": "LT",
+    "martui": "MARUTI",
+    "maruthi": "MARUTI",
+    "wipor": "WIPRO",
+    "ashian paints": "ASIANPAINT",
+}
+QUERIES = list(EXPECTED) + ["hdfc", "icici", "tata", "mahindra", "airtel", "xyzzy", "pharma"]
+
+
+def synthetic_rows(index, entries: int, rng: random.Random) -> list:
+    rows = [{"symbol": symbol, "name": name} for symbol, name in index.entries]
+    words = ["Global", "Steel", "Power", "Finance", "Pharma", "Textiles", "Infra", "Chemicals", "Foods", "Motors"]
+    while len(rows) < entries:
+        stem = "".join(rng.choices(string.ascii_uppercase, k=rng.randint(3, 8)))
+        rows.append({"symbol": f"{stem}{len(rows)}", "name": f"{stem.title()} {rng.choice(words)} Ltd"})
+    return rows
+
+
+def measure(index, rounds: int) -> dict:
+    timings = []
+    for _ in range(rounds):
+        for query in QUERIES:
+            start = time.perf_counter()
+            if not index.resolve(query):
+                index.search(query)
+            timings.append(time.perf_counter() - start)
+    timings.sort()
+    return {
+        "p50_us": statistics.median(timings) * 1e6,
+        "p99_us": timings[int(len(timings) * 0.99)] * 1e6,
+        "max_us": timings[-1] * 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=10_000)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    bundled = app.get_symbol_index()
+    for query, symbol in EXPECTED.items():
+        top = bundled.search(query, 1)
+        assert top and top[0][0] == symbol, (query, top)
+
+    start = time.perf_counter()
+    large = app.SymbolIndex(synthetic_rows(bundled, args.entries, random.Random(5)))
+    build = time.perf_counter() - start
+
+    for label, index in (("bundled", bundled), ("synthetic", large)):
+        stats = measure(index, args.rounds)
+        print(f"{label:9} {len(index):6} symbols: p50 {stats['p50_us']:7.1f} us, "
+              f"p99 {stats['p99_us']:7.1f} us, max {stats['max_us']:7.1f} us")
+    print(f"synthetic index built in {build * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
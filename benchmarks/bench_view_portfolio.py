@@ -0,0 +1,67 @@
+"""Latency of /view for several portfolio sizes with a mocked price source.
+
+Compares the old sequential pricing loop with ``view_portfolio_command``'s
+bounded fan-out, reporting time to first reply and time to complete output.
+
+    python benchmarks/bench_view_portfolio.py [--latency 0.1] [--sizes 1 5 10 30 100]
+"""
+import argparse
+import asyncio
+import time
+
+from _harness import FakeUpdate, fake_context, latency_stock_source, load_app
+
+app = load_app()
+
+
+def seed_portfolio(user_id: int, size: int, distinct: int):
+    app.portfolio_repo.portfolio.delete_many({"user_id": user_id})
+    app.portfolio_repo.positions.delete_many({"user_id": user_id})
+    app.portfolio_repo.portfolio.insert_many([
+        {"stock_code": f"SYM{i % distinct}", "buy_price": 2400.0, "quantity": 10, "user_id": user_id}
+        for i in range(size)
+    ])
+
+
+async def sequential_view(user_id: int) -> float:
+    # The pre-fan-out handler: one awaited price lookup per lot
+    start = time.perf_counter()
+    for stock in app.portfolio_repo.portfolio.find({"user_id": user_id}):
+        await app.get_current_price(stock["stock_code"])
+    return time.perf_counter() - start
+
+
+async def fanout_view(user_id: int):
+    timings = {}
+    start = time.perf_counter()
+
+    def on_send(message):
+        timings.setdefault("first", time.perf_counter() - start)
+
+    update = FakeUpdate(user_id, on_send=on_send)
+    await app.view_portfolio_command(update, fake_context())
+    return timings["first"], time.perf_counter() - start
+
+
+async def main(args):
+    counter = latency_stock_source(app, args.latency)
+    print(f"{'holdings':>8} | {'sequential s':>12} | {'first reply s':>13} | {'complete s':>10} | {'requests':>8}")
+    for size in args.sizes:
+        distinct = max(1, int(size * args.distinct_ratio))
+        seed_portfolio(1, size, distinct)
+        app.quote_cache.invalidate()
+        app.quote_table.clear()
+        sequential = await sequential_view(1)
+        app.quote_cache.invalidate()
+        app.quote_table.clear()
+        counter["requests"] = 0
+        first, complete = await fanout_view(1)
+        print(f"{size:>8} | {sequential:>12.3f} | {first:>13.3f} | {complete:>10.3f} | {counter['requests']:>8}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=0.1, help="mocked price lookup latency (s)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 5, 10, 30, 100])
+    parser.add_argument("--distinct-ratio", type=float, default=0.7, help="distinct symbols / holdings")
+    asyncio.run(main(parser.parse_args()))
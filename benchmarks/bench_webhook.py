@@ -0,0 +1,247 @@
+"""Load test for webhook mode: router + workers fed with synthetic Telegram updates.
+
+Starts a stand-in Telegram Bot API server, ``--workers`` webhook workers and the
+``WebhookRouter`` in one process (each worker is a separate PTB application, as
+it would be in its own process), then replays a full ``/add`` conversation
+(command, symbol, price, quantity) for ``--chats`` chats at the router's webhook
+endpoint. Reports accept latency and end-to-end throughput, and checks that:
+
+* every chat's updates were handled by a single worker (sticky routing),
+* every conversation completed with a holding written to Mongo,
+* a conversation interrupted by a worker restart resumes from persisted state,
+* ``WorkerSupervisor`` restarts a killed worker process, and backs off when it
+  keeps dying right after starting.
+
+Everything shares one event loop here, so throughput is a lower bound for a
+deployment where the router and each worker have their own process.
+
+    python benchmarks/bench_webhook.py [--workers 4] [--chats 200] [--concurrency 8]
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import multiprocessing
+import os
+import signal
+import statistics
+import time
+from collections import defaultdict
+
+import httpx
+from _harness import load_app
+
+app = load_app()
+# Importable once load_app() has put the repository root on sys.path
+import webhook  # noqa: E402
+
+ROUTER_PORT = 18443
+WORKER_PORT = 18500
+BOT_API_PORT = 18600
+
+
+class StubBotAPI:
+    """Answers getMe/sendMessage and friends, recording every message sent per chat."""
+
+    def __init__(self):
+        self.sent = defaultdict(list)
+        self.message_ids = itertools.count(1)
+
+    async def handle(self, method, path, headers, body):
+        endpoint = path.rsplit("/", 1)[-1].lower()
+        params = json.loads(body) if body and headers.get("content-type", "").startswith("application/json") else {}
+        if not params and body:
+            from urllib.parse import parse_qsl
+
+            params = dict(parse_qsl(body.decode()))
+        if endpoint == "getme":
+            result = {"id": 1, "is_bot": True, "first_name": "Bench", "username": "bench_bot",
+                      "can_join_groups": False, "can_read_all_group_messages": False,
+                      "supports_inline_queries": False}
+        elif endpoint in ("sendmessage", "editmessagetext"):
+            chat_id = int(params.get("chat_id", 0))
+            self.sent[chat_id].append(params.get("text", ""))
+            result = {"message_id": next(self.message_ids), "date": int(time.time()),
+                      "chat": {"id": chat_id, "type": "private"}, "text": params.get("text", "")}
+        else:
+            result = True
+        return 200, json.dumps({"ok": True, "result": result}).encode()
+
+
+def text_update(update_id: int, chat_id: int, text: str) -> dict:
+    message = {
+        "message_id": update_id, "date": int(time.time()), "text": text,
+        "chat": {"id": chat_id, "type": "private"},
+        "from": {"id": chat_id, "is_bot": False, "first_name": f"user{chat_id}"},
+    }
+    if text.startswith("/"):
+        message["entities"] = [{"type": "bot_command", "offset": 0, "length": len(text.split()[0])}]
+    return {"update_id": update_id, "message": message}
+
+
+def fresh_handlers():
+    # Workers normally live in separate processes; in one process each needs its own
+    # ConversationHandler instances since those hold the conversation state
+    handlers = []
+    for handler in app.HANDLERS:
+        if isinstance(handler, app.ConversationHandler):
+            handler = app.ConversationHandler(
+                entry_points=handler.entry_points, states=handler.states, fallbacks=handler.fallbacks,
+                name=handler.name, persistent=True,
+            )
+        handlers.append(handler)
+    return handlers
+
+
+class Cluster:
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.stops = {}
+        self.tasks = {}
+
+    async def start_worker(self, index: int):
+        app.HANDLERS = fresh_handlers()
+        stop = asyncio.Event()
+        self.stops[index] = stop
+        self.tasks[index] = asyncio.create_task(app.run_webhook_worker(index, WORKER_PORT + index, stop))
+        for _ in range(100):
+            try:
+                async with httpx.AsyncClient() as client:
+                    await client.get(f"http://127.0.0.1:{WORKER_PORT + index}/")
+                return
+            except httpx.HTTPError:
+                await asyncio.sleep(0.05)
+        raise RuntimeError(f"worker {index} did not start")
+
+    async def stop_worker(self, index: int):
+        self.stops[index].set()
+        await self.tasks.pop(index)
+
+
+async def replay(client, updates: list, concurrency: int) -> list:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def post(update):
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.post(f"http://127.0.0.1:{ROUTER_PORT}/telegram", json=update,
+                                         headers={"X-Telegram-Bot-Api-Secret-Token": "bench"})
+            latencies.append(time.perf_counter() - start)
+            assert response.status_code == 200, response.status_code
+
+    # Steps are sent in order per chat: step n+1 of a chat only after step n was accepted
+    for step in updates:
+        await asyncio.gather(*[post(update) for update in step])
+    return latencies
+
+
+async def wait_for(predicate, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise TimeoutError("timed out waiting for the workers")
+        await asyncio.sleep(0.02)
+
+
+async def run(args):
+    stub = StubBotAPI()
+    stub_server = await webhook.HTTPServer(stub.handle).start("127.0.0.1", BOT_API_PORT)
+    app.telegram_token = "123456:BENCH"
+    app.TELEGRAM_API_BASE_URL = f"http://127.0.0.1:{BOT_API_PORT}/bot"
+    app.PERSISTENCE_INTERVAL = 0.2
+    # Keep the close_clients() of a stopped worker from closing the shared clients
+    app.close_clients = lambda _app: asyncio.sleep(0)
+    app.portfolio_repo.portfolio.drop()
+    app.portfolio_repo.positions.drop()
+    app.portfolio_repo.conversations.drop()
+    app.portfolio_repo.bot_user_data.drop()
+
+    cluster = Cluster(args.workers)
+    for index in range(args.workers):
+        await cluster.start_worker(index)
+    router = webhook.WebhookRouter(
+        [f"http://127.0.0.1:{WORKER_PORT + index}/" for index in range(args.workers)], secret="bench"
+    )
+    router_server = await webhook.HTTPServer(router.handle).start("127.0.0.1", ROUTER_PORT)
+
+    chats = [1000 + chat for chat in range(args.chats)]
+    ids = itertools.count(1)
+    steps = [[text_update(next(ids), chat, text) for chat in chats] for text in ("/add", "reliance", "2400", "10")]
+    assignments = {chat: router.worker_for(steps[0][i]) for i, chat in enumerate(chats)}
+
+    async with httpx.AsyncClient(limits=httpx.Limits(max_connections=args.concurrency)) as client:
+        start = time.perf_counter()
+        latencies = await replay(client, steps, args.concurrency)
+        await wait_for(lambda: all(any("✅" in text for text in stub.sent[chat]) for chat in chats))
+        elapsed = time.perf_counter() - start
+
+        holdings = app.portfolio_repo.portfolio.count_documents({"stock_code": "RELIANCE"})
+        assert holdings == len(chats), holdings
+        for worker in range(args.workers):
+            expected = sum(1 for chat in chats if assignments[chat] == worker) * len(steps)
+            assert router.forwarded[worker] == expected, (worker, router.forwarded[worker], expected)
+
+        latencies.sort()
+        print(f"{len(chats)} chats x {len(steps)} updates over {args.workers} workers: "
+              f"{len(latencies) / elapsed:.0f} updates/s end to end")
+        print(f"router accept latency: p50 {statistics.median(latencies) * 1e3:.2f} ms, "
+              f"p99 {latencies[int(len(latencies) * 0.99)] * 1e3:.2f} ms")
+        print(f"forwarded per worker: {router.forwarded}  (sticky by chat id - OK)")
+
+        # Interrupt a conversation with a worker restart and finish it afterwards
+        chat = chats[0]
+        worker = assignments[chat]
+        await replay(client, [[text_update(next(ids), chat, "/add")], [text_update(next(ids), chat, "tcs")]], 1)
+        await wait_for(lambda: any("TCS" in text for text in stub.sent[chat]))
+        await cluster.stop_worker(worker)
+        await cluster.start_worker(worker)
+        await replay(client, [[text_update(next(ids), chat, "3500")], [text_update(next(ids), chat, "5")]], 1)
+        await wait_for(lambda: app.portfolio_repo.portfolio.count_documents({"user_id": chat, "stock_code": "TCS"}) == 1)
+        print(f"conversation resumed after restarting worker {worker} - OK")
+
+    await router_server.close()
+    await router.aclose()
+    for index in list(cluster.tasks):
+        await cluster.stop_worker(index)
+    await stub_server.close()
+    await check_supervisor()
+
+
+def idle_worker(index: int):
+    time.sleep(60)
+
+
+async def check_supervisor():
+    supervisor = webhook.WorkerSupervisor(idle_worker, 2, interval=0.05, context=multiprocessing.get_context("fork"))
+    supervisor.start()
+    stop = asyncio.Event()
+    task = asyncio.ensure_future(supervisor.run(stop))
+    try:
+        first = supervisor.workers[0].pid
+        os.kill(first, signal.SIGKILL)
+        await wait_for(lambda: supervisor.workers[0] is not None and supervisor.workers[0].pid != first)
+        assert supervisor.workers[0].is_alive() and supervisor.workers[1].is_alive()
+        # Dying again right after the restart: the next start waits out a back-off
+        killed = time.monotonic()
+        os.kill(supervisor.workers[0].pid, signal.SIGKILL)
+        await wait_for(lambda: supervisor.restarts[0] == 2 and supervisor.workers[0] is not None)
+        waited = time.monotonic() - killed
+        assert supervisor.workers[0].is_alive() and waited >= 0.1, waited
+        print(f"supervisor: killed worker restarted at once, again after a {waited * 1e3:.0f} ms back-off - OK")
+    finally:
+        stop.set()
+        await task
+        supervisor.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--chats", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
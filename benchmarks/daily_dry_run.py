@@ -0,0 +1,42 @@
+"""Dry run of the 09:00 send_daily_predictions job against local stand-ins.
+
+MongoDB is in-memory, RapidAPI, Groq and Telegram are replaced by fakes with
+configurable latency, so the whole job can be timed offline. Per-stage metrics
+are printed as JSON.
+
+    python benchmarks/daily_dry_run.py --users 300 --holdings 5 --symbols 50
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from _harness import FakeApplication, FakeBot, fake_groq_class, latency_stock_source, load_app, seed_users
+
+app = load_app()
+
+
+async def main(args):
+    seed_users(app, args.users, args.holdings, args.symbols)
+    rapid = latency_stock_source(app, args.api_latency)
+    groq = {}
+    app.clients.reset_groq(fake_groq_class(args.llm_latency, groq))
+    bot = FakeBot(args.send_latency)
+    start = time.perf_counter()
+    summary = await app.send_daily_predictions(FakeApplication(bot))
+    summary["total_s"] = round(time.perf_counter() - start, 3)
+    summary["rapidapi_requests"] = rapid["requests"]
+    summary["llm_requests"] = groq["requests"]
+    summary["messages_sent"] = len(bot.sent)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--holdings", type=int, default=5)
+    parser.add_argument("--symbols", type=int, default=50)
+    parser.add_argument("--api-latency", type=float, default=0.2)
+    parser.add_argument("--llm-latency", type=float, default=0.05)
+    parser.add_argument("--send-latency", type=float, default=0.05)
+    asyncio.run(main(parser.parse_args()))
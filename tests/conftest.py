@@ -0,0 +1,27 @@
+"""Shared fixtures: the repository on an in-memory MongoDB.
+
+mongomock comes from requirements-dev.txt. Each of its writes is made atomic,
+as on a real server, so concurrent repository calls behave as they would in
+production. The benchmark fakes for Telegram updates are reused.
+"""
+import os
+import sys
+
+import mongomock
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+from _harness import serialize_mongomock  # noqa: E402
+
+import app  # noqa: E402
+
+serialize_mongomock(mongomock)
+
+
+@pytest.fixture
+def repo(monkeypatch):
+    db = mongomock.MongoClient()["stockerbot_test"]
+    repository = app.PortfolioRepository(lambda: db, max_workers=8)
+    monkeypatch.setattr(app, "portfolio_repo", repository)
+    yield repository
+    repository.close()
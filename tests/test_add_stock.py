@@ -0,0 +1,26 @@
+import asyncio
+
+import pytest
+from _harness import FakeUpdate, fake_context
+
+import app
+
+
+@pytest.mark.parametrize("text", ["0", "-5", "-2400.5"])
+def test_non_positive_buy_price_is_asked_again(text):
+    context = fake_context()
+    update = FakeUpdate(1, text)
+    assert asyncio.run(app.stock_buy_price_handler(update, context)) == app.STOCK_BUY_PRICE
+    assert "buy_price" not in context.user_data
+    assert "positive" in update.message.replies[0].text
+
+
+@pytest.mark.parametrize("text", ["0", "-10"])
+def test_non_positive_quantity_leaves_the_position_alone(repo, text):
+    repo.positions.insert_one({"user_id": 1, "stock_code": "TCS", "quantity": 10, "invested": 35000.0, "lots": 1})
+    context = fake_context()
+    context.user_data.update(stock_code="TCS", buy_price=3500.0)
+    update = FakeUpdate(1, text)
+    assert asyncio.run(app.stock_quantity_handler(update, context)) == app.STOCK_QUANTITY
+    assert repo.portfolio.count_documents({}) == 0
+    assert repo.positions.find_one({"user_id": 1, "stock_code": "TCS"})["quantity"] == 10
@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+from _harness import FakeUpdate, fake_context
+
+import app
+
+
+@pytest.fixture
+def price_lookups(monkeypatch):
+    looked_up = []
+
+    async def get_current_price(stock_code, max_age=None):
+        looked_up.append(stock_code)
+        return 2500.0
+
+    monkeypatch.setattr(app, "get_current_price", get_current_price)
+    return looked_up
+
+
+def buttons(message) -> list:
+    return [button.callback_data for row in message.reply_markup.inline_keyboard for button in row]
+
+
+def test_listed_symbol_goes_straight_to_direction(price_lookups):
+    update, context = FakeUpdate(1, "tcs"), fake_context()
+    state = asyncio.run(app.alert_symbol_handler(update, context))
+    assert state == app.ALERT_DIRECTION
+    assert context.user_data["alert_stock_code"] == "TCS"
+    assert price_lookups == ["TCS"]
+
+
+def test_typo_is_offered_suggestions_without_a_price_lookup(price_lookups):
+    update, context = FakeUpdate(1, "Relaince"), fake_context()
+    state = asyncio.run(app.alert_symbol_handler(update, context))
+    assert state == app.ALERT_SUGGESTIONS
+    assert "ALERTSYM_RELIANCE" in buttons(update.message.replies[0])
+    assert "alert_stock_code" not in context.user_data
+    assert price_lookups == []
+
+
+@pytest.mark.parametrize("callback_data, stock_code", [("ALERTSYM_RELIANCE", "RELIANCE"), ("ALERTSYM_OTHER", "RELAINCE")])
+def test_picked_suggestion_becomes_the_alert_symbol(price_lookups, callback_data, stock_code):
+    context = fake_context()
+    asyncio.run(app.alert_symbol_handler(FakeUpdate(1, "Relaince"), context))
+    update = FakeUpdate(1, callback_data=callback_data)
+    state = asyncio.run(app.alert_suggestions_handler(update, context))
+    assert state == app.ALERT_DIRECTION
+    assert context.user_data["alert_stock_code"] == stock_code
+    assert price_lookups == [stock_code]
+    assert stock_code in update.callback_query.message.text
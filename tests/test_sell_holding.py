@@ -0,0 +1,141 @@
+import asyncio
+
+import pytest
+from _harness import FakeUpdate, fake_context
+
+import app
+
+
+def add_lot(repo, quantity: int, user_id: int = 1, stock_code: str = "TCS", buy_price: float = 3500.0) -> str:
+    doc_id = repo.portfolio.insert_one(
+        {"stock_code": stock_code, "buy_price": buy_price, "quantity": quantity, "user_id": user_id}
+    ).inserted_id
+    repo._rebuild_positions(user_id)
+    return str(doc_id)
+
+
+def position_quantity(repo, user_id: int = 1, stock_code: str = "TCS"):
+    position = repo.positions.find_one({"user_id": user_id, "stock_code": stock_code})
+    return None if position is None else position["quantity"]
+
+
+@pytest.mark.parametrize("lot_quantity, sellers, sell_quantity", [(100, 50, 3), (100, 10, 10), (10, 20, 1)])
+def test_concurrent_sells_never_oversell(repo, lot_quantity, sellers, sell_quantity):
+    doc_id = add_lot(repo, lot_quantity)
+
+    async def sell_all():
+        return await asyncio.gather(*[repo.sell_holding(doc_id, 3600.0, sell_quantity) for _ in range(sellers)])
+
+    filled = [lot for lot in asyncio.run(sell_all()) if lot is not None]
+    expected = min(sellers, lot_quantity // sell_quantity)
+    sold = sum(trade["quantity"] for trade in repo.trades.find())
+    assert len(filled) == expected
+    assert sold == expected * sell_quantity
+    remaining = lot_quantity - sold
+    lot = repo.portfolio.find_one({"_id": app.ObjectId(doc_id)})
+    if remaining:
+        assert lot["quantity"] == remaining and lot["fills"] == []
+        assert position_quantity(repo) == remaining
+    else:
+        assert lot is None and position_quantity(repo) is None
+
+
+def test_sold_out_lot_is_removed_by_whichever_sale_settles_last(repo, monkeypatch):
+    doc_id = add_lot(repo, 2)
+    settle = repo._settle_fills
+    deferred = []
+    # The first sale stalls before settling, so the sale taking the last share settles first
+    monkeypatch.setattr(repo, "_settle_fills", lambda lot, fill_ids: deferred.append((lot, fill_ids)))
+    asyncio.run(repo.sell_holding(doc_id, 3600.0, 1))
+    monkeypatch.delattr(repo, "_settle_fills")
+    asyncio.run(repo.sell_holding(doc_id, 3600.0, 1))
+    assert repo.portfolio.find_one({"_id": app.ObjectId(doc_id)})["quantity"] == 0
+
+    settle(*deferred[0])
+    assert repo.portfolio.find_one({"_id": app.ObjectId(doc_id)}) is None
+    assert repo.trades.count_documents({}) == 2
+
+
+def test_error_after_decrement_still_completes_the_sale(repo, monkeypatch):
+    doc_id = add_lot(repo, 10)
+
+    def broken(lot, fill):
+        raise ConnectionError("trades unavailable")
+
+    monkeypatch.setattr(repo, "_record_trade", broken)
+    lot = asyncio.run(repo.sell_holding(doc_id, 3600.0, 4))
+    assert lot["quantity"] == 6 and lot["fill"]["quantity"] == 4
+    assert repo.trades.count_documents({}) == 0
+    monkeypatch.delattr(repo, "_record_trade")
+
+    assert asyncio.run(repo.recover_sales(min_age=0)) == 1
+    assert repo.trades.count_documents({}) == 1
+    assert position_quantity(repo) == 6
+    assert repo.portfolio.find_one({"_id": app.ObjectId(doc_id)})["fills"] == []
+
+
+def test_retried_sale_with_same_fill_id_sells_once(repo, monkeypatch):
+    doc_id = add_lot(repo, 10)
+    fill_id = str(app.ObjectId())
+    # The write commits but its reply is lost, as on a dropped connection
+    find_one_and_update = repo.portfolio.find_one_and_update
+
+    def lost_reply(*args, **kwargs):
+        find_one_and_update(*args, **kwargs)
+        raise ConnectionError("connection reset")
+
+    monkeypatch.setattr(repo.portfolio, "find_one_and_update", lost_reply)
+    with pytest.raises(ConnectionError):
+        asyncio.run(repo.sell_holding(doc_id, 3600.0, 4, fill_id))
+    monkeypatch.setattr(repo.portfolio, "find_one_and_update", find_one_and_update)
+
+    lot = asyncio.run(repo.sell_holding(doc_id, 3600.0, 4, fill_id))
+    assert lot["quantity"] == 6
+    again = asyncio.run(repo.sell_holding(doc_id, 3600.0, 4, fill_id))
+    assert again["quantity"] == 6 and again["fill"]["_id"] == lot["fill"]["_id"]
+    assert repo.trades.count_documents({}) == 1
+    assert position_quantity(repo) == 6
+
+
+def test_handler_retry_after_failed_sale_does_not_sell_twice(repo, monkeypatch):
+    doc_id = add_lot(repo, 10)
+    context = fake_context()
+    context.user_data.update(removal_doc_id=doc_id, removal_stock_code="TCS", sell_price=3600.0)
+    find_one_and_update = repo.portfolio.find_one_and_update
+
+    def lost_reply(*args, **kwargs):
+        find_one_and_update(*args, **kwargs)
+        raise ConnectionError("connection reset")
+
+    monkeypatch.setattr(repo.portfolio, "find_one_and_update", lost_reply)
+    update = FakeUpdate(1, "4")
+    assert asyncio.run(app.remove_stock_quantity_handler(update, context)) == app.REMOVAL_QUANTITY
+    assert "will not be sold twice" in update.message.replies[-1].text
+    monkeypatch.setattr(repo.portfolio, "find_one_and_update", find_one_and_update)
+
+    update = FakeUpdate(1, "4")
+    assert asyncio.run(app.remove_stock_quantity_handler(update, context)) == app.ConversationHandler.END
+    assert "Sold 4 shares" in update.message.replies[-1].text
+    assert repo.portfolio.find_one({"_id": app.ObjectId(doc_id)})["quantity"] == 6
+    assert repo.trades.count_documents({}) == 1
+    assert position_quantity(repo) == 6
+    assert "removal_fill_id" not in context.user_data
+
+
+def test_handler_ends_conversation_when_follow_up_writes_fail(repo, monkeypatch):
+    doc_id = add_lot(repo, 10)
+    context = fake_context()
+    context.user_data.update(removal_doc_id=doc_id, removal_stock_code="TCS", sell_price=3600.0)
+
+    def broken(*args, **kwargs):
+        raise ConnectionError("positions unavailable")
+
+    monkeypatch.setattr(repo, "_apply_to_position", broken)
+    update = FakeUpdate(1, "4")
+    assert asyncio.run(app.remove_stock_quantity_handler(update, context)) == app.ConversationHandler.END
+    assert "Sold 4 shares" in update.message.replies[-1].text
+    assert repo.trades.count_documents({}) == 1
+    # The position catches up at the next recovery pass
+    monkeypatch.delattr(repo, "_apply_to_position")
+    assert asyncio.run(repo.recover_sales(min_age=0)) == 1
+    assert position_quantity(repo) == 6
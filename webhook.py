@@ -0,0 +1,251 @@
+# Webhook deployment: the HTTP server, the router that spreads Telegram's webhook over
+# worker processes, the lease that elects the worker running background tasks, and the
+# supervisor that keeps the workers alive. Nothing here knows about the bot itself;
+# app.py wires these to its PTB application.
+import asyncio
+import json
+import logging
+import multiprocessing
+import time
+from http import HTTPStatus
+
+import httpx
+
+# Largest request body accepted; Telegram updates are far smaller
+MAX_BODY = 1 << 20
+
+class HTTPServer:
+    # Minimal HTTP/1.1 server (keep-alive, Content-Length bodies) for the webhook router, the
+    # workers and the metrics endpoint; handler(method, path, headers, body) returns (status,
+    # body bytes[, content type], JSON by default). close() also drops open keep-alive
+    # connections, so nothing reaches a worker that is shutting down.
+    def __init__(self, handler, max_body: int = MAX_BODY):
+        self.handler = handler
+        self.max_body = max_body
+        self._server = None
+        self._writers = set()
+        self._tasks = set()
+
+    async def start(self, host: str, port: int):
+        self._server = await asyncio.start_server(self._connection, host, port)
+        return self
+
+    async def close(self):
+        self._server.close()
+        for writer in list(self._writers):
+            writer.close()
+        # Closed sockets end the connection loops; let them finish instead of leaving them to be cancelled
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        await self._server.wait_closed()
+
+    async def _connection(self, reader, writer):
+        self._writers.add(writer)
+        self._tasks.add(asyncio.current_task())
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0))
+                content_type = ()
+                if length > self.max_body:
+                    status, payload = HTTPStatus.REQUEST_ENTITY_TOO_LARGE, b"{}"
+                    headers["connection"] = "close"
+                else:
+                    body = await reader.readexactly(length)
+                    try:
+                        status, payload, *content_type = await self.handler(method, path, headers, body)
+                    except Exception:
+                        logging.exception("Webhook handler failed")
+                        status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, b"{}"
+                content_type = content_type[0] if content_type else "application/json"
+                status = HTTPStatus(status)
+                writer.write(
+                    f"HTTP/1.1 {status.value} {status.phrase}\r\nContent-Type: {content_type}\r\n"
+                    f"Content-Length: {len(payload)}\r\n\r\n".encode("latin-1") + payload
+                )
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            self._tasks.discard(asyncio.current_task())
+            writer.close()
+
+class WebhookRouter:
+    # Receives Telegram's webhook and forwards each update to a worker chosen by chat id.
+    # Routing is sticky because PTB keeps conversation state in the owning process (Mongo
+    # persistence only makes it durable), so every update of a chat must land on the same one.
+    def __init__(self, worker_urls: list, secret: str = None, path: str = "/telegram"):
+        self.worker_urls = worker_urls
+        self.secret = secret
+        self.path = path
+        self.forwarded = [0] * len(worker_urls)
+        # A few keep-alive connections per worker; larger httpx pools cost more to schedule than they gain
+        pool_size = 8 * len(worker_urls)
+        self._client = httpx.AsyncClient(
+            timeout=10.0, limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        )
+
+    @staticmethod
+    def route_key(update: dict) -> int:
+        for field in ("message", "edited_message", "channel_post", "edited_channel_post"):
+            if field in update:
+                return update[field]["chat"]["id"]
+        callback = update.get("callback_query")
+        if callback:
+            message = callback.get("message")
+            return message["chat"]["id"] if message else callback["from"]["id"]
+        for field in ("inline_query", "chosen_inline_result", "shipping_query", "pre_checkout_query"):
+            if field in update:
+                return update[field]["from"]["id"]
+        return update.get("update_id", 0)
+
+    def worker_for(self, update: dict) -> int:
+        return self.route_key(update) % len(self.worker_urls)
+
+    async def handle(self, method: str, path: str, headers: dict, body: bytes):
+        if method != "POST" or path != self.path:
+            return HTTPStatus.NOT_FOUND, b"{}"
+        if self.secret and headers.get("x-telegram-bot-api-secret-token") != self.secret:
+            return HTTPStatus.FORBIDDEN, b"{}"
+        try:
+            worker = self.worker_for(json.loads(body))
+        except (ValueError, KeyError, TypeError):
+            return HTTPStatus.BAD_REQUEST, b"{}"
+        try:
+            response = await self._client.post(self.worker_urls[worker], content=body)
+        except httpx.HTTPError as e:
+            # A non-2xx answer makes Telegram redeliver the update later
+            logging.warning("Worker %d unreachable: %s", worker, e)
+            return HTTPStatus.BAD_GATEWAY, b"{}"
+        self.forwarded[worker] += 1
+        return response.status_code, b"{}"
+
+    async def aclose(self):
+        await self._client.aclose()
+
+class LeaderLease:
+    # Renewed lock (locks.acquire_lock / release_lock) that elects one worker to run work that
+    # must not run twice. await on_renew(won) follows every renewal, with won=True when the
+    # lease was just taken; await on_lost() follows losing it.
+    def __init__(self, locks, owner: str, ttl: float, on_renew, on_lost, name: str = "background_leader"):
+        self.locks = locks
+        self.owner = owner
+        self.ttl = ttl
+        self.on_renew = on_renew
+        self.on_lost = on_lost
+        self.name = name
+        self.held = False
+        self._task = None
+
+    async def renew(self) -> bool:
+        try:
+            held = await self.locks.acquire_lock(self.name, self.owner, self.ttl)
+        except Exception:
+            logging.exception("Leader lease renewal failed")
+            held = False
+        if held:
+            if not self.held:
+                logging.info("%s now holds the %s lease", self.owner, self.name)
+            await self.on_renew(not self.held)
+        elif self.held:
+            logging.info("%s lost the %s lease", self.owner, self.name)
+            await self.on_lost()
+        self.held = held
+        return held
+
+    async def run(self):
+        while True:
+            await self.renew()
+            await asyncio.sleep(self.ttl / 3)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.held:
+            await self.locks.release_lock(self.name, self.owner)
+            self.held = False
+
+class WorkerSupervisor:
+    # Keeps one process per webhook worker slot. The router sends a chat's updates to a fixed
+    # slot, so a dead worker would answer 502 for all of its chats: it is restarted, right away
+    # the first time and with a doubling delay while it keeps dying soon after starting.
+    QUICK_EXIT = 30
+    MAX_BACKOFF = 60
+
+    def __init__(self, target, count: int, interval: float = 1.0, context=None):
+        self.target = target
+        self.interval = interval
+        # Spawned (not forked) by default, so each worker gets its own MongoClient and event loop
+        self.context = context or multiprocessing.get_context("spawn")
+        self.workers = [None] * count
+        self.restarts = [0] * count
+        self._started = [0.0] * count
+        self._failures = [0] * count
+        self._retry_at = [0.0] * count
+
+    def start(self):
+        for index in range(len(self.workers)):
+            self._spawn(index)
+
+    def _spawn(self, index: int):
+        worker = self.context.Process(target=self.target, args=(index,), name=f"bot-worker-{index}")
+        worker.start()
+        self.workers[index] = worker
+        self._started[index] = time.monotonic()
+
+    def check(self) -> int:
+        # Restarts dead workers whose back-off has passed; returns how many were started
+        now = time.monotonic()
+        started = 0
+        for index, worker in enumerate(self.workers):
+            if worker is not None:
+                if worker.is_alive():
+                    continue
+                worker.join()
+                uptime = now - self._started[index]
+                failures = self._failures[index] = self._failures[index] + 1 if uptime < self.QUICK_EXIT else 0
+                delay = min(self.interval * 2 ** (failures - 1), self.MAX_BACKOFF) if failures > 1 else 0.0
+                logging.error("Webhook worker %d exited with code %s after %.1fs; restarting in %.1fs",
+                              index, worker.exitcode, uptime, delay)
+                self.workers[index] = None
+                self.restarts[index] += 1
+                self._retry_at[index] = now + delay
+            if now >= self._retry_at[index]:
+                self._spawn(index)
+                started += 1
+        return started
+
+    async def run(self, stop: asyncio.Event):
+        while not stop.is_set():
+            try:
+                await asyncio.wait_for(stop.wait(), self.interval)
+            except asyncio.TimeoutError:
+                self.check()
+
+    def stop(self):
+        workers = [worker for worker in self.workers if worker is not None]
+        for worker in workers:
+            worker.terminate()
+        for worker in workers:
+            worker.join()